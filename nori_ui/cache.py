@@ -0,0 +1,306 @@
+"""Caches."""
+
+import os
+import tempfile
+import time
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Union
+
+from log import LOG
+
+
+class LRUCache(object):
+    """A bounded, least-recently-used cache.
+
+    The cache is bounded by the number of entries it holds and optionally by
+    the total cost of the entries (eg. their memory size). When the cache is
+    full, the least recently used entries are evicted to make room for the
+    new one.
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = None, max_cost: Optional[int] = None
+    ) -> None:
+        """Init.
+
+        Args:
+            max_size (int): The maximum number of entries to hold.
+                If nothing is provided, a default is used.
+            max_cost (int): The maximum total cost of the entries.
+                If nothing is provided, the cost is not bounded.
+        """
+        super(LRUCache, self).__init__()
+
+        self.max_size = max_size or 32
+        self.max_cost = max_cost
+        self.total_cost = 0
+        self._entries = OrderedDict()
+        self._costs = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get an entry from the cache and mark it as recently used.
+
+        Args:
+            key (hashable): The key of the entry.
+            default (any): The value to return if the entry does not exist.
+
+        Returns:
+            (any): The cached value or the default.
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any, cost: Optional[int] = 1) -> None:
+        """Add an entry to the cache, evicting old entries if required.
+
+        Args:
+            key (hashable): The key of the entry.
+            value (any): The value to cache.
+            cost (int): The cost of the entry.
+        """
+        self.total_cost += cost - self._costs.get(key, 0)
+        self._costs[key] = cost
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        # Always keep the newest entry, even if it exceeds the maximum cost
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_size
+            or (self.max_cost and self.total_cost > self.max_cost)
+        ):
+            evicted_key, _ = self._entries.popitem(last=False)
+            self.total_cost -= self._costs.pop(evicted_key)
+
+    def invalidate(
+        self, predicate: Optional[Callable[[Hashable], bool]] = None
+    ) -> int:
+        """Remove entries from the cache.
+
+        Args:
+            predicate (function): Function taking a key and returning whether
+                the entry should be removed.
+                If nothing is provided, all the entries are removed.
+
+        Returns:
+            (int): The number of removed entries.
+        """
+        if not predicate:
+            count = len(self._entries)
+            self._entries.clear()
+            self._costs.clear()
+            self.total_cost = 0
+            return count
+
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+            self.total_cost -= self._costs.pop(key)
+
+        return len(keys)
+
+    def keys(self) -> list:
+        """Get the keys in the cache, from least to most recently used.
+
+        Returns:
+            (list): The cache keys.
+        """
+        return list(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return whether the key is in the cache."""
+        return key in self._entries
+
+    def __len__(self) -> int:
+        """Return the number of entries in the cache."""
+        return len(self._entries)
+
+
+class DiskCache(object):
+    """A cache of text or binary entries stored as files in a directory.
+
+    Entries are keyed by a hash, so an entry never goes stale; when the
+    source of an entry changes its key changes too. Old entries are garbage
+    collected based on their age and the number of entries in the cache.
+    """
+
+    EXTENSION = '.cache'
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: Optional[int] = None,
+        max_age: Optional[float] = None,
+        binary: Optional[bool] = False,
+    ) -> None:
+        """Init.
+
+        Args:
+            directory (str): Path to the folder storing the entries.
+                It is created if it does not exist.
+            max_entries (int): The maximum number of entries to keep.
+                If nothing is provided, a default is used.
+            max_age (float): The maximum age of an unused entry in days.
+                If nothing is provided, a default is used.
+            binary (bool): Whether the entries are bytes instead of text.
+        """
+        super(DiskCache, self).__init__()
+
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_entries = max_entries or 64
+        self.max_age = max_age or 30
+        self.binary = binary
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_entry_path(self, key: str) -> str:
+        """Get the path to the file of an entry.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            (str): Path to the entry file.
+        """
+        return os.path.join(self.directory, f'{key}{self.EXTENSION}')
+
+    def get_open_args(self, mode: str) -> dict:
+        """Get the arguments to open an entry file with.
+
+        Args:
+            mode (str): Either 'r' or 'w'.
+
+        Returns:
+            (dict): The keyword arguments for open.
+        """
+        if self.binary:
+            return {'mode': f'{mode}b'}
+
+        return {'mode': mode, 'encoding': 'utf-8'}
+
+    def get(self, key: str) -> Optional[Union[str, bytes]]:
+        """Get an entry from the cache.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            data (str or bytes) or None: The cached data if it exists.
+        """
+        entry_path = self.get_entry_path(key)
+        try:
+            with open(entry_path, **self.get_open_args('r')) as inFile:
+                data = inFile.read()
+        except OSError:
+            return None
+
+        # Mark the entry as recently used for garbage collection
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return data
+
+    def put(self, key: str, data: Union[str, bytes]) -> bool:
+        """Add an entry to the cache and collect the garbage.
+
+        The entry is written to a temporary file first so other processes
+        never read a partial entry.
+
+        Args:
+            key (str): The key of the entry.
+            data (str or bytes): The data to cache.
+
+        Returns:
+            (bool): Whether or not the entry was successfully written.
+        """
+        temp_path = None
+        try:
+            handle, temp_path = tempfile.mkstemp(
+                dir=self.directory, suffix='.tmp'
+            )
+            with os.fdopen(handle, **self.get_open_args('w')) as outFile:
+                outFile.write(data)
+            os.replace(temp_path, self.get_entry_path(key))
+        except OSError as error:
+            LOG.error(f'Unable to write cache entry {key}: {error}')
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        self.collect_garbage()
+        return True
+
+    def collect_garbage(self) -> int:
+        """Remove entries that are too old or exceed the maximum count.
+
+        Returns:
+            (int): The number of removed entries.
+        """
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(self.EXTENSION)
+            ]
+        except OSError:
+            return 0
+
+        # Other processes sharing the cache may remove entries at any time,
+        # so entries that vanish are skipped
+        entry_times = []
+        for entry in entries:
+            try:
+                entry_times.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+
+        # Most recently used first
+        entry_times.sort(reverse=True)
+        oldest_time = time.time() - (self.max_age * 86400)
+
+        removed = 0
+        for index, (mtime, path) in enumerate(entry_times):
+            if index < self.max_entries and mtime >= oldest_time:
+                continue
+
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+
+        return removed
+
+    def clear(self) -> int:
+        """Remove all the entries from the cache.
+
+        Returns:
+            (int): The number of removed entries.
+        """
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+
+        removed = 0
+        for entry in entries:
+            if not entry.name.endswith(self.EXTENSION):
+                continue
+
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+
+        return removed
@@ -0,0 +1,473 @@
+"""Config loading.
+
+The config is merged from layers, each overriding the keys of the previous
+ones:
+
+- The package config, which defines every key.
+- The site config, from the NORI_SITE_CONFIG environment variable.
+- The user config, from the NORI_USER_CONFIG environment variable or
+    ~/.config/nori_ui/config.yaml.
+- Environment variables named after the keys, eg. NORI_ICONS_LOCATION.
+
+Parsed configs are cached as JSON, keyed by the modification time, size
+and hash of the config file, so warm starts do not need to import yaml or
+parse the config at all.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from typing import Any, Optional
+
+from exceptions import exceptions
+
+# Bump this when the cache format changes to invalidate cached configs
+CACHE_VERSION = 1
+
+# Prefix of the environment variables overriding config keys
+ENVIRONMENT_PREFIX = 'NORI_'
+
+# The expected type of each config value. Lists are written as [type] and
+# mappings as {key type: value type}.
+SCHEMA = {
+    'locked_menus': [str],
+    'font_types': [str],
+    'icons_location': str,
+    'styles_location': str,
+    'palettes_location': str,
+    'fonts_location': str,
+    'nori_github_page': str,
+    'stylesheet_cache_size': int,
+    'theme_cache_location': str,
+    'theme_cache_max_entries': int,
+    'theme_cache_max_age': (int, float),
+    'apply_style_to_app': bool,
+    'hot_reload_debounce': int,
+    'prune_stylesheet': bool,
+    'pruned_stylesheet_cache_size': int,
+    'icon_cache_size': int,
+    'icon_cache_budget': (int, float),
+    'icon_types': [str],
+    'icon_manifest': str,
+    'icon_atlas': str,
+    'resource_bundle': str,
+    'use_resource_bundle': bool,
+    'preload_icons': [str],
+    'icon_variant_colors': {str: str},
+    'svg_cache_location': str,
+    'svg_cache_max_entries': int,
+    'lazy_fonts': bool,
+    'font_loader_threads': int,
+    'font_index_location': str,
+    'log_handler': str,
+    'log_queue': bool,
+    'log_level': str,
+    'log_console_lines': int,
+}
+
+# The allowed values of the config keys only taking a few values
+CHOICES = {
+    'log_handler': ('rich', 'plain'),
+    'log_level': ('NOTSET', 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'),
+}
+
+
+def get_type_name(expected: Any) -> str:
+    """Get a readable name of an expected type.
+
+    Args:
+        expected (type, tuple, list or dict): The expected type.
+
+    Returns:
+        (str): The name of the type, eg. 'list of str'.
+    """
+    if isinstance(expected, tuple):
+        return ' or '.join(get_type_name(item) for item in expected)
+
+    if isinstance(expected, list):
+        return f'list of {get_type_name(expected[0])}'
+
+    if isinstance(expected, dict):
+        key_type, value_type = next(iter(expected.items()))
+        return (
+            f'mapping of {get_type_name(key_type)} to '
+            f'{get_type_name(value_type)}'
+        )
+
+    return expected.__name__
+
+
+def is_type(value: Any, expected: type) -> bool:
+    """Return whether a value is of a type.
+
+    Booleans are not accepted as numbers, even though bool is a subclass
+    of int.
+
+    Args:
+        value (any): The value to check.
+        expected (type): The expected type.
+
+    Returns:
+        (bool): Whether the value is of the type.
+    """
+    if isinstance(value, bool) and expected is not bool:
+        return False
+
+    return isinstance(value, expected)
+
+
+def validate_value(key: str, value: Any, expected: Any) -> Optional[str]:
+    """Validate a config value against its expected type.
+
+    Values of the keys in CHOICES must also be one of the allowed values.
+
+    Args:
+        key (str): The path to the value, eg. 'preload_icons[2]'.
+        value (any): The value to validate.
+        expected (type, tuple, list or dict): The expected type.
+
+    Returns:
+        (str) or None: A description of the error, if the value is invalid.
+    """
+    error = (
+        f'"{key}" expected {get_type_name(expected)}, got '
+        f'{type(value).__name__} {value!r}'
+    )
+
+    if isinstance(expected, tuple):
+        if any(is_type(value, item) for item in expected):
+            return None
+        return error
+
+    if isinstance(expected, list):
+        if not isinstance(value, list):
+            return error
+        for index, item in enumerate(value):
+            item_error = validate_value(f'{key}[{index}]', item, expected[0])
+            if item_error:
+                return item_error
+        return None
+
+    if isinstance(expected, dict):
+        if not isinstance(value, dict):
+            return error
+        key_type, value_type = next(iter(expected.items()))
+        for item_key, item in value.items():
+            item_error = validate_value(
+                f'{key}.{item_key}', item_key, key_type
+            ) or validate_value(f'{key}.{item_key}', item, value_type)
+            if item_error:
+                return item_error
+        return None
+
+    if not is_type(value, expected):
+        return error
+
+    if key in CHOICES and value not in CHOICES[key]:
+        return (
+            f'"{key}" expected one of '
+            f'{", ".join(repr(choice) for choice in CHOICES[key])}, got '
+            f'{value!r}'
+        )
+
+    return None
+
+
+def validate_config(
+    config: Any, config_path: str, partial: Optional[bool] = False
+) -> None:
+    """Validate a config against the schema.
+
+    Args:
+        config (any): The parsed config.
+        config_path (str): Path to the config file, for error messages.
+        partial (bool): Whether the config only overrides some keys.
+            Unknown keys are rejected instead of missing keys.
+
+    Raises:
+        NoriConfigError: If a key is missing, unknown or has an invalid
+            value.
+    """
+    if partial and config is None:
+        return
+
+    if not isinstance(config, dict):
+        raise exceptions.NoriConfigError(
+            f'Invalid config in {config_path}: expected a mapping of keys '
+            f'to values, got {type(config).__name__}.'
+        )
+
+    for key in config:
+        if partial and key not in SCHEMA:
+            raise exceptions.NoriConfigError(
+                f'Invalid config in {config_path}: "{key}" is not a known '
+                'key.'
+            )
+
+    for key, expected in SCHEMA.items():
+        if key not in config:
+            if partial:
+                continue
+            raise exceptions.NoriConfigError(
+                f'Invalid config in {config_path}: "{key}" is missing.'
+            )
+
+        error = validate_value(key, config[key], expected)
+        if error:
+            raise exceptions.NoriConfigError(
+                f'Invalid config in {config_path}: {error}.'
+            )
+
+
+def parse_config(data: bytes, config_path: str) -> dict:
+    """Parse a YAML config, using the C loader if it is available.
+
+    Args:
+        data (bytes): The contents of the config file.
+        config_path (str): Path to the config file, for error messages.
+
+    Returns:
+        (dict): The config.
+
+    Raises:
+        NoriConfigError: If the config is not valid YAML.
+    """
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        return yaml.load(data, Loader=loader)
+    except yaml.YAMLError as error:
+        raise exceptions.NoriConfigError(
+            f'Invalid config in {config_path}: {error}'
+        )
+
+
+def get_cache_path(config_path: str) -> Optional[str]:
+    """Get the path to the cache of a config.
+
+    The cache folder is set through the NORI_CONFIG_CACHE environment
+    variable, which disables the cache when empty.
+
+    Args:
+        config_path (str): Path to the config file.
+
+    Returns:
+        (str) or None: Path to the cache file, if caching is enabled.
+    """
+    cache_folder = os.environ.get('NORI_CONFIG_CACHE')
+    if cache_folder is None:
+        cache_folder = os.path.join(
+            os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser('~'), '.cache'),
+            'nori_ui',
+        )
+
+    if not cache_folder:
+        return None
+
+    name = hashlib.sha256(config_path.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_folder, f'config-{name}.json')
+
+
+def get_schema_hash() -> str:
+    """Get a hash of the schema, so cached configs follow schema changes.
+
+    Returns:
+        (str): The hash of the schema.
+    """
+    return hashlib.sha256(
+        repr((CACHE_VERSION, SCHEMA, CHOICES)).encode('utf-8')
+    ).hexdigest()
+
+
+def read_cache(cache_path: str) -> Optional[dict]:
+    """Read a cached config.
+
+    Args:
+        cache_path (str): Path to the cache file.
+
+    Returns:
+        (dict) or None: The cache, if it exists and is valid.
+    """
+    try:
+        with open(cache_path, 'r') as inFile:
+            cache = json.load(inFile)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get('schema') != get_schema_hash():
+        return None
+
+    if any(key not in cache for key in ('mtime', 'size', 'hash', 'config')):
+        return None
+
+    return cache
+
+
+def write_cache(cache_path: str, cache: dict) -> None:
+    """Write a cached config, ignoring any errors.
+
+    Args:
+        cache_path (str): Path to the cache file.
+        cache (dict): The cache.
+    """
+    temp_path = None
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(cache_path), suffix='.tmp'
+        )
+        with os.fdopen(handle, 'w') as outFile:
+            json.dump(cache, outFile)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def load_config(config_path: str, partial: Optional[bool] = False) -> dict:
+    """Load and validate a config file, using the cache when possible.
+
+    The cache is used without reading the config file when its
+    modification time and size are unchanged, and without parsing it when
+    its hash is unchanged.
+
+    Args:
+        config_path (str): Path to the config file.
+        partial (bool): Whether the config only overrides some keys.
+
+    Returns:
+        config (dict): The config.
+
+    Raises:
+        NoriConfigError: If the config file is missing or invalid.
+    """
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        raise exceptions.NoriConfigError(
+            f'Config file missing from: {config_path}.'
+        )
+
+    cache_path = get_cache_path(config_path)
+    cache = read_cache(cache_path) if cache_path else None
+    if cache and [cache['mtime'], cache['size']] == [
+        stat.st_mtime_ns,
+        stat.st_size,
+    ]:
+        return cache['config']
+
+    with open(config_path, 'rb') as inFile:
+        data = inFile.read()
+    data_hash = hashlib.sha256(data).hexdigest()
+
+    if cache and cache['hash'] == data_hash:
+        config = cache['config']
+    else:
+        config = parse_config(data, config_path)
+        validate_config(config, config_path, partial)
+        config = config or {}
+
+    if cache_path:
+        write_cache(
+            cache_path,
+            {
+                'schema': get_schema_hash(),
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'hash': data_hash,
+                'config': config,
+            },
+        )
+
+    return config
+
+
+def get_config_layers(config_path: str) -> list[str]:
+    """Get the config files to merge, from lowest to highest priority.
+
+    Args:
+        config_path (str): Path to the package config file.
+
+    Returns:
+        (list): Paths to the package config and the existing site and user
+            config files.
+    """
+    site_path = os.environ.get('NORI_SITE_CONFIG')
+    user_path = os.environ.get(
+        'NORI_USER_CONFIG',
+        os.path.join(
+            os.environ.get('XDG_CONFIG_HOME')
+            or os.path.join(os.path.expanduser('~'), '.config'),
+            'nori_ui',
+            'config.yaml',
+        ),
+    )
+
+    return [config_path] + [
+        os.path.abspath(os.path.expanduser(path))
+        for path in (site_path, user_path)
+        if path and os.path.isfile(os.path.expanduser(path))
+    ]
+
+
+def get_environment_config() -> dict:
+    """Get the config keys overridden by environment variables.
+
+    Values are parsed as JSON when possible, eg. 'true' or '["&File"]',
+    and used as strings otherwise.
+
+    Returns:
+        config (dict): The overridden values keyed by config key.
+
+    Raises:
+        NoriConfigError: If a value is invalid.
+    """
+    config = {}
+    for key, expected in SCHEMA.items():
+        name = f'{ENVIRONMENT_PREFIX}{key.upper()}'
+        if name not in os.environ:
+            continue
+
+        try:
+            value = json.loads(os.environ[name])
+        except ValueError:
+            value = os.environ[name]
+
+        if expected is str or value is None:
+            value = os.environ[name]
+
+        error = validate_value(key, value, expected)
+        if error:
+            raise exceptions.NoriConfigError(
+                f'Invalid config in environment variable {name}: {error}.'
+            )
+
+        config[key] = value
+
+    return config
+
+
+def load_layered_config(config_path: str) -> dict:
+    """Load the config merged from all of its layers.
+
+    Args:
+        config_path (str): Path to the package config file.
+
+    Returns:
+        config (dict): The merged config.
+
+    Raises:
+        NoriConfigError: If any layer is missing or invalid.
+    """
+    layers = get_config_layers(config_path)
+
+    config = dict(load_config(layers[0]))
+    for layer_path in layers[1:]:
+        config.update(load_config(layer_path, partial=True))
+    config.update(get_environment_config())
+
+    return config
@@ -0,0 +1,175 @@
+"""Config reloading and change notifications."""
+
+from PySide6 import QtCore
+
+import init
+import utils
+
+from log import LOG
+
+# The notifier shared by every subsystem; see get_config_notifier
+NOTIFIER = None
+
+# The config keys used by each subsystem
+ICON_KEYS = frozenset(
+    (
+        'icons_location',
+        'icon_types',
+        'icon_manifest',
+        'icon_atlas',
+        'icon_variant_colors',
+        'svg_cache_location',
+        'svg_cache_max_entries',
+    )
+)
+FONT_KEYS = frozenset(
+    ('fonts_location', 'font_types', 'font_index_location', 'lazy_fonts')
+)
+STYLE_KEYS = frozenset(
+    (
+        'styles_location',
+        'palettes_location',
+        'theme_cache_location',
+        'theme_cache_max_entries',
+        'theme_cache_max_age',
+        # Stylesheets refer to the icons folder
+        'icons_location',
+    )
+)
+CACHE_KEYS = frozenset(
+    (
+        'stylesheet_cache_size',
+        'pruned_stylesheet_cache_size',
+        'icon_cache_size',
+        'icon_cache_budget',
+        'theme_cache_location',
+        'theme_cache_max_entries',
+        'theme_cache_max_age',
+        'svg_cache_location',
+        'svg_cache_max_entries',
+    )
+)
+
+
+class ConfigNotifier(QtCore.QObject):
+    """Notify the subsystems using config keys when the keys change.
+
+    Connect to 'changed' to receive every changed key at once, or to
+    'key_changed' to receive each changed key with its new value.
+    """
+
+    changed = QtCore.Signal(list)
+    key_changed = QtCore.Signal(str, object)
+
+    def notify(self, changed_keys: list[str]) -> None:
+        """Emit the signals for changed keys.
+
+        Args:
+            changed_keys (list): The keys whose value changed.
+        """
+        for key in changed_keys:
+            self.key_changed.emit(key, init.CONFIG.get(key))
+
+        self.changed.emit(changed_keys)
+
+
+def refresh_caches(changed_keys: list[str]) -> None:
+    """Apply changed cache settings.
+
+    Args:
+        changed_keys (list): The keys whose value changed.
+    """
+    if CACHE_KEYS.intersection(changed_keys):
+        utils.apply_cache_config()
+
+
+def refresh_icons(changed_keys: list[str]) -> None:
+    """Index the icons again if their settings changed.
+
+    Args:
+        changed_keys (list): The keys whose value changed.
+    """
+    if not ICON_KEYS.intersection(changed_keys):
+        return
+
+    import icon_atlas
+
+    icon_atlas.reset_icon_atlas()
+    utils.refresh_icon_index()
+
+
+def refresh_fonts(changed_keys: list[str]) -> None:
+    """Look for fonts again if their settings changed.
+
+    Args:
+        changed_keys (list): The keys whose value changed.
+    """
+    if not FONT_KEYS.intersection(changed_keys):
+        return
+
+    import font_index
+
+    font_index.reset_font_index()
+    utils.get_font_registry().clear_requests()
+
+    if init.CONFIG['lazy_fonts']:
+        utils.register_font_families()
+
+
+def refresh_styles(changed_keys: list[str]) -> None:
+    """Restyle the windows if the style settings changed.
+
+    Args:
+        changed_keys (list): The keys whose value changed.
+    """
+    if not STYLE_KEYS.intersection(changed_keys):
+        return
+
+    import nori
+
+    utils.invalidate_stylesheet_cache()
+
+    # Windows following the application stylesheet apply it again
+    utils.clear_app_stylesheet()
+    for window in nori.Nori.get_instances():
+        if window.style != 'none':
+            window.refresh_stylesheet()
+
+
+def get_config_notifier() -> ConfigNotifier:
+    """Get the config notifier, connecting the subsystems on first use.
+
+    Returns:
+        (ConfigNotifier): The config notifier.
+    """
+    global NOTIFIER
+
+    if not NOTIFIER:
+        NOTIFIER = ConfigNotifier(utils.get_app_instance())
+        # Caches are updated first so the other subsystems use them
+        for refresh in (
+            refresh_caches,
+            refresh_icons,
+            refresh_fonts,
+            refresh_styles,
+        ):
+            NOTIFIER.changed.connect(refresh)
+
+    return NOTIFIER
+
+
+def reload_config() -> list[str]:
+    """Reload the config and refresh the subsystems using changed keys.
+
+    The resource bundle is only registered at startup, so changes to
+    'resource_bundle' and 'use_resource_bundle' need a restart.
+
+    Returns:
+        changed_keys (list): The sorted keys whose value changed.
+    """
+    changed_keys = init.reload_config()
+    if changed_keys:
+        LOG.info('Config changed: %s', ', '.join(changed_keys))
+        get_config_notifier().notify(changed_keys)
+
+    return changed_keys
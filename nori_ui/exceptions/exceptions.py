@@ -2,4 +2,4 @@
 
 
 class NoriConfigError(Exception):
-    """Used when a config cannot be found."""
+    """Used when a config cannot be found or is invalid."""
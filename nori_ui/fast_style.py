@@ -0,0 +1,210 @@
+"""Fast styling through a QPalette and QProxyStyle instead of a stylesheet.
+
+Stylesheets are the most expensive part of creating and resizing windows
+with a lot of widgets. The fast style maps the palette variables onto a
+QPalette and a QProxyStyle instead, preserving this subset of the visuals:
+
+- Colors: @base_color, @inset_color, @alternate_color, @text_color,
+    @text_color_active, @text_color_disabled, @highlight_color,
+    @active_color, @border_color, @menu_color, @disabled_color and
+    @error_color.
+- Fonts: @font_family and @font_size.
+- Metrics: @toggle_size for check box and radio button indicators.
+
+Anything else in the stylesheet (borders, radii, icons, object name
+styling, etc.) is not applied.
+"""
+
+import re
+import shiboken6
+
+from PySide6 import QtGui, QtWidgets
+from typing import Optional
+
+import utils
+
+# The style name selecting the fast style
+FAST_STYLE = utils.FAST_STYLE
+
+# The base style the fast style is built on
+BASE_STYLE = 'Fusion'
+
+# The proxy style and palette file applied to the application; see
+# apply_fast_style
+APP_STYLE = None
+APP_PALETTE = None
+
+SIZE_PATTERN = re.compile(r'(\d+)')
+
+# QPalette color roles and the palette variables they use
+COLOR_ROLES = {
+    QtGui.QPalette.Window: '@base_color',
+    QtGui.QPalette.WindowText: '@text_color',
+    QtGui.QPalette.Base: '@inset_color',
+    QtGui.QPalette.AlternateBase: '@alternate_color',
+    QtGui.QPalette.Text: '@text_color',
+    QtGui.QPalette.Button: '@inset_color',
+    QtGui.QPalette.ButtonText: '@text_color',
+    QtGui.QPalette.BrightText: '@error_color',
+    QtGui.QPalette.Highlight: '@highlight_color',
+    QtGui.QPalette.HighlightedText: '@text_color',
+    QtGui.QPalette.Link: '@active_color',
+    QtGui.QPalette.LinkVisited: '@active_color',
+    QtGui.QPalette.ToolTipBase: '@menu_color',
+    QtGui.QPalette.ToolTipText: '@text_color',
+    QtGui.QPalette.PlaceholderText: '@text_color_disabled',
+    QtGui.QPalette.Light: '@border_color',
+    QtGui.QPalette.Midlight: '@border_color',
+    QtGui.QPalette.Mid: '@border_color',
+    QtGui.QPalette.Dark: '@border_color',
+    QtGui.QPalette.Shadow: '@base_color',
+}
+
+# Disabled QPalette color roles and the palette variables they use
+DISABLED_COLOR_ROLES = {
+    QtGui.QPalette.WindowText: '@text_color_disabled',
+    QtGui.QPalette.Text: '@text_color_disabled',
+    QtGui.QPalette.ButtonText: '@text_color_disabled',
+    QtGui.QPalette.Button: '@disabled_color',
+    QtGui.QPalette.Highlight: '@disabled_color',
+    QtGui.QPalette.HighlightedText: '@text_color_disabled',
+}
+
+
+def build_palette(variables: dict[str, str]) -> QtGui.QPalette:
+    """Build a QPalette from the palette variables.
+
+    Args:
+        variables (dict): The values keyed by variable name.
+
+    Returns:
+        palette (QPalette): The palette.
+    """
+    palette = QtGui.QPalette()
+
+    for group, roles in (
+        (QtGui.QPalette.All, COLOR_ROLES),
+        (QtGui.QPalette.Disabled, DISABLED_COLOR_ROLES),
+    ):
+        for role, variable in roles.items():
+            color = utils.parse_color(variables.get(variable, ''))
+            if color:
+                palette.setColor(group, role, color)
+
+    return palette
+
+
+def build_font(variables: dict[str, str]) -> QtGui.QFont:
+    """Build a QFont from the palette variables.
+
+    Args:
+        variables (dict): The values keyed by variable name.
+
+    Returns:
+        font (QFont): The font.
+    """
+    font = QtGui.QFont()
+
+    if variables.get('@font_family'):
+        utils.load_font_family(variables['@font_family'])
+        font.setFamily(variables['@font_family'])
+
+    match = SIZE_PATTERN.search(variables.get('@font_size', ''))
+    if match:
+        font.setPixelSize(int(match.group(1)))
+
+    return font
+
+
+class NoriProxyStyle(QtWidgets.QProxyStyle):
+    """Proxy style applying the palette metrics on top of a base style."""
+
+    INDICATOR_METRICS = (
+        QtWidgets.QStyle.PM_IndicatorWidth,
+        QtWidgets.QStyle.PM_IndicatorHeight,
+        QtWidgets.QStyle.PM_ExclusiveIndicatorWidth,
+        QtWidgets.QStyle.PM_ExclusiveIndicatorHeight,
+    )
+
+    def __init__(self, variables: dict[str, str]) -> None:
+        """Init.
+
+        Args:
+            variables (dict): The values keyed by variable name.
+        """
+        super(NoriProxyStyle, self).__init__(BASE_STYLE)
+
+        self.indicator_size = None
+        self.set_variables(variables)
+
+    def set_variables(self, variables: dict[str, str]) -> None:
+        """Set the palette metrics.
+
+        Args:
+            variables (dict): The values keyed by variable name.
+        """
+        match = SIZE_PATTERN.search(variables.get('@toggle_size', ''))
+        self.indicator_size = int(match.group(1)) if match else None
+
+    def pixelMetric(
+        self,
+        metric: QtWidgets.QStyle.PixelMetric,
+        option: Optional[QtWidgets.QStyleOption] = None,
+        widget: Optional[QtWidgets.QWidget] = None,
+    ) -> int:
+        """Get a pixel metric, using the palette metrics where defined.
+
+        Override of built in pixelMetric.
+        """
+        if self.indicator_size and metric in self.INDICATOR_METRICS:
+            return self.indicator_size
+
+        return super(NoriProxyStyle, self).pixelMetric(metric, option, widget)
+
+
+def apply_fast_style(
+    palette: Optional[str] = '', widget: Optional[QtWidgets.QWidget] = None
+) -> None:
+    """Apply the fast style to a window or the whole application.
+
+    The proxy style can only be applied to the whole application since
+    widgets do not pass their style on to their children; a single window
+    only gets the palette and font.
+
+    Args:
+        palette (str): Name of the palette
+        widget (QWidget): The window to style.
+            If nothing is provided, the whole application is styled.
+    """
+    global APP_STYLE, APP_PALETTE
+
+    variables = utils.get_palette_variables(palette)
+
+    if widget:
+        widget.setPalette(build_palette(variables))
+        widget.setFont(build_font(variables))
+        return
+
+    app = utils.get_app_instance()
+    if not app:
+        raise RuntimeError('No currently running QApplication.')
+
+    # Restyling the application is expensive, so only do it when required
+    palette_file = utils.find_palette(palette)
+    if APP_PALETTE == palette_file and not utils.get_app_theme():
+        return
+
+    # A stylesheet would take precedence over the fast style
+    utils.clear_app_stylesheet()
+
+    # The proxy style is created once and updated afterwards, since
+    # replacing the application style deletes the previous one
+    if APP_STYLE and shiboken6.isValid(APP_STYLE):
+        APP_STYLE.set_variables(variables)
+    else:
+        APP_STYLE = NoriProxyStyle(variables)
+        app.setStyle(APP_STYLE)
+
+    app.setPalette(build_palette(variables))
+    app.setFont(build_font(variables))
+    APP_PALETTE = palette_file
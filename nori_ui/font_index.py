@@ -0,0 +1,408 @@
+"""Index of the metadata of font files.
+
+The family, style and weight of each font are read from its 'name' and
+'OS/2' tables rather than guessed from its file name. The index records the
+signature of each folder and file, so a folder is only scanned again when
+files are added to or removed from it, and then only the new or modified
+files are read.
+"""
+
+import io
+import json
+import os
+import struct
+import tempfile
+
+from typing import BinaryIO, Optional
+
+import utils
+
+from init import CONFIG
+from log import LOG
+
+# The index shared by every window; see get_font_index
+INDEX = None
+
+# Bump this when the metadata changes to invalidate persisted indexes
+INDEX_VERSION = 2
+
+# 'name' table ids of the family and style names, preferred first
+FAMILY_NAME_IDS = (16, 1)
+STYLE_NAME_IDS = (17, 2)
+
+# Windows platform, Unicode BMP encoding and US English
+WINDOWS_PLATFORM = 3
+ENGLISH_LANGUAGE = 0x409
+
+# Offsets of usWeightClass and fsSelection in the 'OS/2' table
+OS2_WEIGHT_OFFSET = 4
+OS2_SELECTION_OFFSET = 62
+
+# fsSelection bits marking italic and oblique fonts
+ITALIC_FLAGS = (1 << 0) | (1 << 9)
+
+
+def read_bytes(in_file: BinaryIO, offset: int, length: int) -> bytes:
+    """Read part of a font file.
+
+    Args:
+        in_file (file): The open font file.
+        offset (int): The offset to read from.
+        length (int): The number of bytes to read.
+
+    Returns:
+        data (bytes): The data.
+
+    Raises:
+        struct.error: If the file ends before the data.
+    """
+    in_file.seek(offset)
+    data = in_file.read(length)
+    if len(data) < length:
+        raise struct.error(f'Font file ends before offset {offset + length}')
+
+    return data
+
+
+def get_font_tables(in_file: BinaryIO) -> dict[str, tuple[int, int]]:
+    """Get the tables of a TrueType or OpenType font.
+
+    Only the header and the table directory are read. Font collections use
+    the tables of their first font.
+
+    Args:
+        in_file (file): The open font file.
+
+    Returns:
+        tables (dict): The (offset, length) of each table keyed by tag.
+    """
+    offset = 0
+    header = read_bytes(in_file, 0, 16)
+    if header[:4] == b'ttcf':
+        (offset,) = struct.unpack_from('>I', header, 12)
+        header = read_bytes(in_file, offset, 12)
+
+    (table_count,) = struct.unpack_from('>H', header, 4)
+    directory = read_bytes(in_file, offset + 12, table_count * 16)
+
+    tables = {}
+    for index in range(table_count):
+        tag, _, table_offset, length = struct.unpack_from(
+            '>4sIII', directory, index * 16
+        )
+        tables[tag.decode('latin-1')] = (table_offset, length)
+
+    return tables
+
+
+def read_names(data: bytes) -> dict[int, str]:
+    """Read the names of a font from its 'name' table.
+
+    Windows English names are preferred over any other names.
+
+    Args:
+        data (bytes): The 'name' table.
+
+    Returns:
+        names (dict): The names keyed by name id.
+    """
+    _, count, strings_start = struct.unpack_from('>HHH', data, 0)
+
+    names = {}
+    preferred = set()
+    for index in range(count):
+        platform, _, language, name_id, length, offset = struct.unpack_from(
+            '>HHHHHH', data, 6 + (index * 12)
+        )
+        if name_id in preferred:
+            continue
+
+        name_start = strings_start + offset
+        raw_name = data[name_start : name_start + length]
+        if platform == WINDOWS_PLATFORM:
+            name = raw_name.decode('utf-16-be', errors='replace')
+        elif platform == 1:
+            name = raw_name.decode('mac-roman', errors='replace')
+        else:
+            continue
+
+        if platform == WINDOWS_PLATFORM and language == ENGLISH_LANGUAGE:
+            preferred.add(name_id)
+            names[name_id] = name
+        else:
+            names.setdefault(name_id, name)
+
+    return names
+
+
+def read_font_metadata(in_file: BinaryIO) -> Optional[dict]:
+    """Read the family, style and weight of a font.
+
+    Only the table directory and the 'name' and 'OS/2' tables are read,
+    rather than the whole font.
+
+    Args:
+        in_file (file): The open font file.
+
+    Returns:
+        (dict) or None: The 'family', 'style', 'weight' and 'italic' of the
+            font, if it is a valid font.
+    """
+    try:
+        tables = get_font_tables(in_file)
+        names = read_names(read_bytes(in_file, *tables['name']))
+    except (struct.error, KeyError, IndexError):
+        return None
+
+    family = next(
+        (names[name_id] for name_id in FAMILY_NAME_IDS if names.get(name_id)),
+        None,
+    )
+    if not family:
+        return None
+
+    style = next(
+        (names[name_id] for name_id in STYLE_NAME_IDS if names.get(name_id)),
+        'Regular',
+    )
+
+    weight = 400
+    italic = 'italic' in style.lower() or 'oblique' in style.lower()
+    if 'OS/2' in tables:
+        try:
+            os2_data = read_bytes(
+                in_file, tables['OS/2'][0], OS2_SELECTION_OFFSET + 2
+            )
+            (weight,) = struct.unpack_from('>H', os2_data, OS2_WEIGHT_OFFSET)
+            (selection,) = struct.unpack_from(
+                '>H', os2_data, OS2_SELECTION_OFFSET
+            )
+            italic = italic or bool(selection & ITALIC_FLAGS)
+        except struct.error:
+            pass
+
+    return {
+        'family': family,
+        'style': style,
+        'weight': weight,
+        'italic': italic,
+    }
+
+
+class FontIndex(object):
+    """The metadata of the font files in the scanned folders."""
+
+    def __init__(self, index_path: Optional[str] = None) -> None:
+        """Init.
+
+        Args:
+            index_path (str): Path to the file persisting the index.
+                If nothing is provided, the index is only kept in memory.
+        """
+        super(FontIndex, self).__init__()
+
+        self.index_path = index_path
+        # Signatures of the scanned folders keyed by path
+        self.folders = {}
+        # Metadata and signature of the font files keyed by path
+        self.fonts = {}
+        self.modified = False
+
+        if index_path:
+            self.load()
+
+    def load(self) -> None:
+        """Load the persisted index, if it is valid."""
+        try:
+            with open(self.index_path, 'r') as inFile:
+                index = json.load(inFile)
+            if index['version'] != INDEX_VERSION:
+                return
+
+            self.folders = index['folders']
+            self.fonts = index['fonts']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self) -> bool:
+        """Persist the index, if it was modified.
+
+        Returns:
+            (bool): Whether or not the index was written.
+        """
+        if not self.index_path or not self.modified:
+            return False
+
+        index = {
+            'version': INDEX_VERSION,
+            'folders': self.folders,
+            'fonts': self.fonts,
+        }
+
+        temp_path = None
+        try:
+            folder = os.path.dirname(self.index_path)
+            os.makedirs(folder, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+            with os.fdopen(handle, 'w') as outFile:
+                json.dump(index, outFile)
+            os.replace(temp_path, self.index_path)
+        except OSError as error:
+            LOG.error(f'Unable to write font index {self.index_path}: {error}')
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        self.modified = False
+        return True
+
+    def scan_folder(self, folder: str) -> list[str]:
+        """Index the font files in a folder, unless it is unchanged.
+
+        Args:
+            folder (str): Path to the folder.
+
+        Returns:
+            (list): Paths to the font files in the folder.
+        """
+        signature = list(utils.get_file_signature(folder)[1:])
+        if self.folders.get(folder) == signature:
+            return self.get_folder_fonts(folder)
+
+        font_files = [
+            os.path.join(folder, name)
+            for name in utils.list_folder(folder)
+            if os.path.splitext(name)[1] in CONFIG['font_types']
+        ]
+
+        # Forget the files removed from the folder
+        for font_file in set(self.get_folder_fonts(folder)).difference(
+            font_files
+        ):
+            del self.fonts[font_file]
+
+        for font_file in font_files:
+            self.index_file(font_file)
+
+        self.folders[folder] = signature
+        self.modified = True
+
+        return font_files
+
+    def index_file(self, font_file: str) -> Optional[dict]:
+        """Index a font file, unless it is unchanged.
+
+        Args:
+            font_file (str): Path to the font file.
+
+        Returns:
+            (dict) or None: The metadata of the font, if it is valid.
+        """
+        signature = list(utils.get_file_signature(font_file)[1:])
+        entry = self.fonts.get(font_file)
+        if entry and entry['signature'] == signature:
+            return entry['metadata']
+
+        try:
+            # Resources are already in memory, files are only partly read
+            if utils.is_resource_path(font_file):
+                metadata = read_font_metadata(
+                    io.BytesIO(utils.read_binary_file(font_file))
+                )
+            else:
+                with open(font_file, 'rb') as inFile:
+                    metadata = read_font_metadata(inFile)
+        except OSError as error:
+            LOG.error(f'Unable to read font {font_file}: {error}')
+            metadata = None
+
+        if not metadata:
+            LOG.warning(f'Unable to read font metadata: {font_file}')
+
+        self.fonts[font_file] = {'signature': signature, 'metadata': metadata}
+        self.modified = True
+
+        return metadata
+
+    def get_folder_fonts(self, folder: str) -> list[str]:
+        """Get the indexed font files in a folder.
+
+        Args:
+            folder (str): Path to the folder.
+
+        Returns:
+            (list): The sorted paths to the font files.
+        """
+        return sorted(
+            font_file
+            for font_file in self.fonts
+            if os.path.dirname(font_file) == folder
+        )
+
+    def get_metadata(self, font_file: str) -> Optional[dict]:
+        """Get the metadata of an indexed font file.
+
+        Args:
+            font_file (str): Path to the font file.
+
+        Returns:
+            (dict) or None: The 'family', 'style', 'weight' and 'italic' of
+                the font, if it is indexed and valid.
+        """
+        entry = self.fonts.get(font_file)
+        return entry['metadata'] if entry else None
+
+    def find_fonts(
+        self, folders: list[str], families: Optional[list[str]] = None
+    ) -> list[str]:
+        """Find the font files of families in folders.
+
+        Args:
+            folders (list): Paths to the folders to look in.
+            families (list): Names of the families, matched exactly but
+                ignoring case.
+                If nothing is provided, all the font files are returned.
+
+        Returns:
+            fonts (list): Paths to the font files.
+        """
+        family_names = {family.lower() for family in families or []}
+
+        fonts = []
+        for folder in folders:
+            for font_file in self.scan_folder(folder):
+                metadata = self.get_metadata(font_file)
+                if family_names and (
+                    not metadata
+                    or metadata['family'].lower() not in family_names
+                ):
+                    continue
+                fonts.append(font_file)
+
+        self.save()
+
+        return fonts
+
+
+def get_font_index() -> FontIndex:
+    """Get the font index shared by every window.
+
+    The index is persisted when 'font_index_location' is set in the config.
+
+    Returns:
+        (FontIndex): The font index.
+    """
+    global INDEX
+
+    if not INDEX:
+        location = os.path.expandvars(CONFIG['font_index_location'])
+        INDEX = FontIndex(os.path.expanduser(location) if location else None)
+
+    return INDEX
+
+
+def reset_font_index() -> None:
+    """Forget the font index so it is loaded again on next use."""
+    global INDEX
+
+    INDEX = None
@@ -0,0 +1,290 @@
+"""Process-wide registry of the loaded fonts."""
+
+import os
+
+from PySide6 import QtCore, QtGui
+from typing import Hashable, Optional
+
+from log import LOG
+
+# The registry shared by every window; see get_font_registry
+REGISTRY = None
+
+# Font weights keyed by the style names used in font file names
+FONT_WEIGHTS = {
+    'thin': 100,
+    'extralight': 200,
+    'light': 300,
+    'regular': 400,
+    'medium': 500,
+    'semibold': 600,
+    'bold': 700,
+    'extrabold': 800,
+    'black': 900,
+}
+
+DEFAULT_WEIGHT = 400
+
+
+def get_font_style(font_file: str) -> tuple[int, bool]:
+    """Guess the weight and slant of a font from its file name.
+
+    Args:
+        font_file (str): Path to the font file, eg. 'Rubik-BoldItalic.ttf'.
+
+    Returns:
+        (tuple): The weight and whether the font is italic.
+    """
+    name = os.path.splitext(os.path.basename(font_file))[0]
+    style = name.rpartition('-')[2].lower() if '-' in name else ''
+
+    italic = style.endswith('italic')
+    if italic:
+        style = style[: -len('italic')]
+
+    return FONT_WEIGHTS.get(style, DEFAULT_WEIGHT), italic
+
+
+class FontRegistry(object):
+    """Record the loaded font files and the families they provide.
+
+    Qt registers a font file again every time it is added, so every font
+    goes through the registry to make sure each file is only loaded once.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        super(FontRegistry, self).__init__()
+
+        # Font ids keyed by path, None for files that failed to load
+        self.font_ids = {}
+        # Font ids keyed by family name
+        self.families = {}
+        # Font ids keyed by load request; see get_request
+        self.requests = {}
+        # (path, weight, italic) of the registered font files keyed by
+        # family; see register_font
+        self.manifest = {}
+
+    def load_file(self, font_file: str) -> Optional[int]:
+        """Load a font file, unless it is already loaded.
+
+        Args:
+            font_file (str): Path to the font file.
+
+        Returns:
+            (int) or None: The id of the font, if it loaded.
+        """
+        if font_file in self.font_ids:
+            return self.font_ids[font_file]
+
+        return self.add_font(
+            font_file, QtGui.QFontDatabase.addApplicationFont(font_file)
+        )
+
+    def load_data(self, font_file: str, data: bytes) -> Optional[int]:
+        """Load the data of a font file, unless the file is already loaded.
+
+        Args:
+            font_file (str): Path to the font file the data was read from.
+            data (bytes): The contents of the font file.
+
+        Returns:
+            (int) or None: The id of the font, if it loaded.
+        """
+        if font_file in self.font_ids:
+            return self.font_ids[font_file]
+
+        return self.add_font(
+            font_file,
+            QtGui.QFontDatabase.addApplicationFontFromData(
+                QtCore.QByteArray(data)
+            ),
+        )
+
+    def add_font(self, font_file: str, font_id: int) -> Optional[int]:
+        """Record a font added to the QFontDatabase.
+
+        Args:
+            font_file (str): Path to the font file.
+            font_id (int): The id returned by the QFontDatabase.
+
+        Returns:
+            font_id (int) or None: The id of the font, if it loaded.
+        """
+        if font_id < 0:
+            LOG.error(f'Unable to load font: {font_file}')
+            font_id = None
+        else:
+            for family in QtGui.QFontDatabase.applicationFontFamilies(font_id):
+                self.families.setdefault(family, []).append(font_id)
+
+        self.font_ids[font_file] = font_id
+
+        return font_id
+
+    def is_loaded(self, font_file: str) -> bool:
+        """Return whether a font file has already been loaded.
+
+        Args:
+            font_file (str): Path to the font file.
+
+        Returns:
+            (bool): Whether the file was loaded, successfully or not.
+        """
+        return font_file in self.font_ids
+
+    def get_request(self, request: Hashable) -> Optional[list[int]]:
+        """Get the font ids loaded by a previous request.
+
+        Args:
+            request (hashable): The arguments of the request.
+
+        Returns:
+            (list) or None: The font ids if the request was already made.
+        """
+        return self.requests.get(request)
+
+    def add_request(self, request: Hashable, font_ids: list[int]) -> None:
+        """Record the font ids loaded by a request.
+
+        Args:
+            request (hashable): The arguments of the request.
+            font_ids (list): The loaded font ids.
+        """
+        self.requests[request] = list(font_ids)
+
+    def clear_requests(self) -> None:
+        """Forget the previous requests so they look for fonts again.
+
+        The loaded fonts stay loaded, since Qt cannot unload them while
+        they may be in use.
+        """
+        self.requests.clear()
+
+    def register_font(
+        self,
+        family: str,
+        font_file: str,
+        weight: Optional[int] = None,
+        italic: Optional[bool] = None,
+    ) -> None:
+        """Register a font file to load on first use of its family.
+
+        Args:
+            family (str): Name of the family.
+            font_file (str): Path to the font file.
+            weight (int): The weight of the font.
+                If nothing is provided, it is guessed from the file name.
+            italic (bool): Whether the font is italic.
+                If nothing is provided, it is guessed from the file name.
+        """
+        entries = self.manifest.setdefault(family, [])
+        if any(entry[0] == font_file for entry in entries):
+            return
+
+        guessed_weight, guessed_italic = get_font_style(font_file)
+        entries.append(
+            (
+                font_file,
+                guessed_weight if weight is None else weight,
+                guessed_italic if italic is None else italic,
+            )
+        )
+
+        # Requests made before the family was registered may now load more
+        self.clear_requests()
+
+    def load_family(
+        self,
+        family: str,
+        weight: Optional[int] = None,
+        italic: Optional[bool] = False,
+    ) -> list[int]:
+        """Load the registered font files of a family for a weight.
+
+        Only the files closest to the weight are loaded, so a family with
+        many weights costs no more than the weights in use.
+
+        Args:
+            family (str): Name of the family.
+            weight (int): The weight, eg. 400 for regular or 700 for bold.
+                If nothing is provided, the regular weight is used.
+            italic (bool): Whether to load the italic fonts.
+
+        Returns:
+            font_ids (list): The ids of the loaded fonts.
+        """
+        entries = [
+            entry
+            for entry in self.manifest.get(family, [])
+            if entry[2] == italic
+        ] or self.manifest.get(family, [])
+        if not entries:
+            return []
+
+        weight = weight or DEFAULT_WEIGHT
+        closest = min(abs(entry[1] - weight) for entry in entries)
+
+        font_ids = []
+        for font_file, font_weight, _ in entries:
+            if abs(font_weight - weight) != closest:
+                continue
+
+            font_id = self.load_file(font_file)
+            if font_id is not None:
+                font_ids.append(font_id)
+
+        return font_ids
+
+    def get_registered_families(self) -> list[str]:
+        """Get the families registered to load on first use.
+
+        Returns:
+            (list): The sorted family names.
+        """
+        return sorted(self.manifest)
+
+    def get_families(self) -> list[str]:
+        """Get the families provided by the loaded fonts.
+
+        Returns:
+            (list): The sorted family names.
+        """
+        return sorted(self.families)
+
+    def has_family(self, family: str) -> bool:
+        """Return whether a family is provided by the loaded fonts.
+
+        Args:
+            family (str): Name of the family.
+
+        Returns:
+            (bool): Whether the family is available.
+        """
+        return family in self.families
+
+    def get_font_ids(self, family: str) -> list[int]:
+        """Get the ids of the loaded fonts of a family.
+
+        Args:
+            family (str): Name of the family.
+
+        Returns:
+            (list): The font ids.
+        """
+        return list(self.families.get(family, []))
+
+
+def get_font_registry() -> FontRegistry:
+    """Get the font registry shared by every window.
+
+    Returns:
+        (FontRegistry): The font registry.
+    """
+    global REGISTRY
+
+    if not REGISTRY:
+        REGISTRY = FontRegistry()
+
+    return REGISTRY
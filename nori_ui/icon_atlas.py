@@ -0,0 +1,276 @@
+"""Icon atlas.
+
+The atlas packs all the icons into a single file so they can be loaded with
+one I/O operation instead of one per icon. The file is made of:
+
+- The magic bytes and the size of the header.
+- A JSON header with the size of the image and the position of each icon.
+- The raw, premultiplied ARGB32 pixels of the image.
+
+The pixels are memory-mapped when loading the atlas, so icons are copied
+straight out of the file without decoding.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from PySide6 import QtCore, QtGui
+from typing import Optional
+
+import utils
+
+from init import CONFIG
+from log import LOG
+
+MAGIC = b'NORIATLS'
+HEADER_FORMAT = '<8sI'
+# Pixel data starts on a multiple of this many bytes
+ALIGNMENT = 16
+ATLAS_WIDTH = 1024
+IMAGE_FORMAT = QtGui.QImage.Format_ARGB32_Premultiplied
+
+# The loaded atlas, or False if it is unavailable; see get_icon_atlas
+ATLAS = None
+
+
+def get_atlas_path() -> str:
+    """Return the path to the icon atlas.
+
+    Returns:
+        (str): Path to the icon atlas file.
+    """
+    return os.path.join(utils.get_icons_path(), CONFIG['icon_atlas'])
+
+
+def get_icons_signature(icon_paths: list[str]) -> str:
+    """Get a signature of the icon files, to check the atlas is up to date.
+
+    The signature changes when icons are added, removed or modified.
+
+    Args:
+        icon_paths (list): Paths to the icon files.
+
+    Returns:
+        (str): The signature of the icon files.
+
+    Raises:
+        OSError: If an icon file is missing.
+    """
+    signatures = sorted(
+        [os.path.basename(icon_path)]
+        + list(utils.get_file_signature(icon_path)[1:])
+        for icon_path in icon_paths
+    )
+    return hashlib.sha256(json.dumps(signatures).encode('utf-8')).hexdigest()
+
+
+def get_indexed_icon_paths() -> list[str]:
+    """Get the paths to the icon files in the icon index.
+
+    Returns:
+        (list): The sorted icon paths.
+    """
+    return sorted(set(utils.get_icon_index().values()))
+
+
+def pack_icons(sizes: dict[str, tuple[int, int]]) -> tuple[dict, int]:
+    """Pack icons into rows, tallest first.
+
+    Args:
+        sizes (dict): The (width, height) of each icon keyed by name.
+
+    Returns:
+        (tuple): The (x, y, width, height) of each icon keyed by name and
+            the height of the atlas.
+    """
+    rects = {}
+    x = y = row_height = 0
+
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], name)):
+        width, height = sizes[name]
+        if x + width > ATLAS_WIDTH and x:
+            x = 0
+            y += row_height
+            row_height = 0
+
+        rects[name] = (x, y, width, height)
+        x += width
+        row_height = max(row_height, height)
+
+    return rects, y + row_height
+
+
+def build_icon_atlas(atlas_path: Optional[str] = None) -> str:
+    """Pack all the icons into an atlas file.
+
+    Args:
+        atlas_path (str): Path to write the atlas to.
+            If nothing is provided, it is written to the icons folder.
+
+    Returns:
+        atlas_path (str): Path to the written atlas.
+    """
+    atlas_path = atlas_path or get_atlas_path()
+    icon_files = utils.list_icon_files()
+    icon_paths = [
+        os.path.join(utils.get_icons_path(), icon_file)
+        for icon_file in icon_files
+    ]
+
+    images = {}
+    for icon_file in icon_files:
+        # SVG icons are rendered at the size they are requested at instead
+        if utils.is_svg(icon_file):
+            continue
+
+        image = QtGui.QImage(os.path.join(utils.get_icons_path(), icon_file))
+        if image.isNull():
+            LOG.error(f'Unable to add icon to atlas: {icon_file}')
+            continue
+        images[icon_file] = image.convertToFormat(IMAGE_FORMAT)
+
+    rects, height = pack_icons(
+        {
+            name: (image.width(), image.height())
+            for name, image in images.items()
+        }
+    )
+
+    atlas = QtGui.QImage(max(ATLAS_WIDTH, 1), max(height, 1), IMAGE_FORMAT)
+    atlas.fill(QtCore.Qt.transparent)
+
+    painter = QtGui.QPainter(atlas)
+    painter.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+    for name, image in images.items():
+        painter.drawImage(rects[name][0], rects[name][1], image)
+    painter.end()
+
+    header = json.dumps(
+        {
+            'width': atlas.width(),
+            'height': atlas.height(),
+            'bytes_per_line': atlas.bytesPerLine(),
+            'icons': rects,
+            'signature': get_icons_signature(icon_paths),
+        }
+    ).encode('utf-8')
+    header_size = struct.calcsize(HEADER_FORMAT) + len(header)
+    padding = -header_size % ALIGNMENT
+
+    with open(atlas_path, 'wb') as outFile:
+        outFile.write(struct.pack(HEADER_FORMAT, MAGIC, len(header)))
+        outFile.write(header)
+        outFile.write(b'\0' * padding)
+        outFile.write(atlas.constBits()[: atlas.sizeInBytes()])
+
+    LOG.info('Packed %d icons into: %s', len(rects), atlas_path)
+
+    return atlas_path
+
+
+class IconAtlas(object):
+    """An icon atlas memory-mapped from its file."""
+
+    def __init__(self, atlas_path: str) -> None:
+        """Init.
+
+        Args:
+            atlas_path (str): Path to the atlas file.
+
+        Raises:
+            ValueError: If the file is not a valid atlas.
+        """
+        super(IconAtlas, self).__init__()
+
+        self.atlas_path = atlas_path
+
+        with open(atlas_path, 'rb') as inFile:
+            self.mapped_file = mmap.mmap(
+                inFile.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        header_start = struct.calcsize(HEADER_FORMAT)
+        magic, header_length = struct.unpack_from(
+            HEADER_FORMAT, self.mapped_file
+        )
+        if magic != MAGIC:
+            self.mapped_file.close()
+            raise ValueError(f'Not an icon atlas: {atlas_path}')
+
+        header_end = header_start + header_length
+        header = json.loads(self.mapped_file[header_start:header_end])
+        pixels_start = header_end + (-header_end % ALIGNMENT)
+
+        self.rects = header['icons']
+        # Signature of the icon files the atlas was built from
+        self.signature = header.get('signature')
+        self.image = QtGui.QImage(
+            memoryview(self.mapped_file)[pixels_start:],
+            header['width'],
+            header['height'],
+            header['bytes_per_line'],
+            IMAGE_FORMAT,
+        )
+
+    def get_image(self, icon_name: str) -> Optional[QtGui.QImage]:
+        """Copy an icon out of the atlas.
+
+        Args:
+            icon_name (str): The file name of the icon.
+
+        Returns:
+            (QImage) or None: The icon if it is in the atlas.
+        """
+        rect = self.rects.get(icon_name)
+        if not rect:
+            return None
+
+        return self.image.copy(*rect)
+
+    def __contains__(self, icon_name: str) -> bool:
+        """Return whether the icon is in the atlas."""
+        return icon_name in self.rects
+
+
+def get_icon_atlas() -> Optional[IconAtlas]:
+    """Get the icon atlas, loading it on first use.
+
+    The atlas is only used if it exists and was built from the current icon
+    files, ie. no icon was added, removed or modified since. The icon files
+    are checked rather than the icons folder, since writing the atlas and
+    manifest also modifies the folder.
+
+    Returns:
+        (IconAtlas) or None: The icon atlas if it is available.
+    """
+    global ATLAS
+
+    if ATLAS is not None:
+        return ATLAS or None
+
+    ATLAS = False
+    atlas_path = get_atlas_path()
+    try:
+        atlas = IconAtlas(atlas_path)
+        signature = get_icons_signature(get_indexed_icon_paths())
+    except (OSError, ValueError) as error:
+        LOG.debug('Icon atlas is unavailable: %s', error)
+        return None
+
+    if atlas.signature != signature:
+        LOG.debug('Icon atlas is out of date: %s', atlas_path)
+        return None
+
+    ATLAS = atlas
+
+    return ATLAS
+
+
+def reset_icon_atlas() -> None:
+    """Forget the loaded icon atlas so it is loaded again on next use."""
+    global ATLAS
+
+    ATLAS = None
@@ -0,0 +1,150 @@
+"""Background icon preloading."""
+
+import time
+
+from collections import deque
+from PySide6 import QtCore, QtGui
+from typing import Optional
+
+import utils
+
+from log import LOG
+
+# The running preloader; see preload_icons
+PRELOADER = None
+
+
+class IconDecoder(QtCore.QRunnable):
+    """Decode an icon into a QImage on a worker thread.
+
+    QImage can be used outside of the GUI thread, unlike QPixmap, so the
+    decoded image is handed back to the GUI thread to be converted.
+    """
+
+    def __init__(
+        self, signals: QtCore.QObject, icon_name: str, icon_path: str
+    ) -> None:
+        """Init.
+
+        Args:
+            signals (IconPreloader): The preloader receiving the image.
+            icon_name (str): Name of the icon.
+            icon_path (str): Path to the icon.
+        """
+        super(IconDecoder, self).__init__()
+
+        self.signals = signals
+        self.icon_name = icon_name
+        self.icon_path = icon_path
+
+    def run(self) -> None:
+        """Decode the icon."""
+        if utils.is_svg(self.icon_path):
+            image = utils.render_svg(self.icon_path)
+        else:
+            image = QtGui.QImage(self.icon_path)
+        self.signals.decoded.emit(self.icon_name, image)
+
+
+class IconPreloader(QtCore.QObject):
+    """Decode icons on worker threads and cache them on the GUI thread.
+
+    Decoded images are converted to pixmaps in small batches, each limited
+    to a few milliseconds, so the GUI thread is never blocked for long.
+    """
+
+    decoded = QtCore.Signal(str, QtGui.QImage)
+    finished = QtCore.Signal()
+
+    # Milliseconds to spend converting images per event loop tick
+    TIME_SLICE = 2
+
+    def __init__(
+        self,
+        icon_names: list[str],
+        parent: Optional[QtCore.QObject] = None,
+    ) -> None:
+        """Init.
+
+        Args:
+            icon_names (list): Names of the icons to preload.
+            parent (QObject): The parent object.
+        """
+        super(IconPreloader, self).__init__(parent)
+
+        self.pending_images = deque()
+        self.remaining = 0
+
+        self.decoded.connect(self.on_decoded)
+
+        self.convert_timer = QtCore.QTimer(self)
+        self.convert_timer.setInterval(0)
+        self.convert_timer.timeout.connect(self.convert_next_images)
+
+        thread_pool = QtCore.QThreadPool.globalInstance()
+        for icon_name in icon_names:
+            if QtGui.QPixmapCache.find(utils.get_pixmap_cache_key(icon_name)):
+                continue
+
+            icon_path = utils.find_icon(icon_name)
+            if not icon_path:
+                continue
+
+            self.remaining += 1
+            thread_pool.start(IconDecoder(self, icon_name, icon_path))
+
+        if not self.remaining:
+            QtCore.QTimer.singleShot(0, self.finished.emit)
+
+    def on_decoded(self, icon_name: str, image: QtGui.QImage) -> None:
+        """Queue a decoded image to be converted.
+
+        Args:
+            icon_name (str): Name of the icon.
+            image (QImage): The decoded icon.
+        """
+        self.pending_images.append((icon_name, image))
+        self.convert_timer.start()
+
+    def convert_next_images(self) -> None:
+        """Convert decoded images to cached pixmaps for a time slice."""
+        end_time = time.perf_counter() + (self.TIME_SLICE / 1000)
+
+        while self.pending_images and time.perf_counter() < end_time:
+            icon_name, image = self.pending_images.popleft()
+            self.remaining -= 1
+
+            cache_key = utils.get_pixmap_cache_key(icon_name)
+            if image.isNull() or QtGui.QPixmapCache.find(cache_key):
+                continue
+
+            QtGui.QPixmapCache.insert(
+                cache_key, QtGui.QPixmap.fromImage(image)
+            )
+
+        if not self.pending_images:
+            self.convert_timer.stop()
+
+        if not self.remaining:
+            LOG.debug('Finished preloading icons.')
+            self.finished.emit()
+
+
+def preload_icons(icon_names: Optional[list[str]] = None) -> IconPreloader:
+    """Start preloading icons in the background.
+
+    Args:
+        icon_names (list): Names of the icons to preload.
+            If nothing is provided, the icons in the config are preloaded.
+
+    Returns:
+        (IconPreloader): The running preloader.
+    """
+    global PRELOADER
+
+    utils.set_pixmap_cache_limit()
+
+    icon_names = icon_names or utils.get_package_config()['preload_icons']
+    PRELOADER = IconPreloader(icon_names, utils.get_app_instance())
+
+    return PRELOADER
@@ -1,23 +1,36 @@
 """Globals."""
 
 import os
-import yaml
 
-from exceptions import exceptions
+from config_loader import load_layered_config
 
 # Define the path local to the package
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 PROJECT_PATH = os.path.dirname(BASE_PATH)
 CONFIG_PATH = os.path.join(PROJECT_PATH, 'configs', 'config.yaml')
 
-# Load the config file
-if not os.path.exists(CONFIG_PATH):
-    raise exceptions.NoriConfigError(
-        f'Config file missing from: {CONFIG_PATH}.'
+# Load the config file and its overrides
+CONFIG = load_layered_config(CONFIG_PATH)
+
+
+def reload_config() -> list[str]:
+    """Reload the config from all of its layers.
+
+    CONFIG is updated in place, so every module sharing it sees the new
+    values. See config_notifier.reload_config to also notify the
+    subsystems using the changed keys.
+
+    Returns:
+        changed_keys (list): The sorted keys whose value changed.
+    """
+    config = load_layered_config(CONFIG_PATH)
+    changed_keys = sorted(
+        key
+        for key in set(CONFIG).union(config)
+        if CONFIG.get(key) != config.get(key)
     )
 
-try:
-    with open(CONFIG_PATH, 'r') as config_file:
-        CONFIG = yaml.full_load(config_file)
-except Exception:
-    raise exceptions.NoriConfigError('Invalid config.')
+    CONFIG.clear()
+    CONFIG.update(config)
+
+    return changed_keys
@@ -1,14 +1,150 @@
-"""Logging."""
+"""Logging.
 
+Records are put on a queue once their message is merged with its
+arguments, and rendered by a listener thread, so neither rich rendering
+nor traceback formatting blocks the thread doing the logging. Set
+'log_handler' to 'plain' in the config to render records with a plain
+stream handler and skip importing rich altogether.
+"""
+
+import atexit
+import copy
 import logging
-from rich.logging import RichHandler
+import logging.handlers
+import queue
+
+from init import CONFIG
+
+LOG_FORMAT = '%(name)s %(asctime)s [%(filename)s:%(lineno)d]> %(message)s'
+DATE_FORMAT = '%Y/%m/%d %I:%M:%S%p'
+
+# The listener rendering the queued records and the handler queuing them;
+# see start_logging
+LISTENER = None
+QUEUE_HANDLER = None
+
+
+class RichLogHandler(logging.Handler):
+    """Render log records with rich, importing it on the first record.
+
+    rich is slow to import, so it is only imported once something is
+    actually logged.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        super(RichLogHandler, self).__init__()
+
+        self.handler = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Render a log record.
+
+        Override of built in emit.
+
+        Args:
+            record (LogRecord): The record to render.
+        """
+        if not self.handler:
+            from rich.logging import RichHandler
+
+            self.handler = RichHandler(rich_tracebacks=True)
+            self.handler.setFormatter(self.formatter)
+
+        self.handler.emit(record)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Queue log records for the listener thread to render.
+
+    Unlike the built in handler, the traceback is not formatted into the
+    message up front, so it is formatted on the listener thread and rich
+    can still render it from the exception info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message of a log record with its arguments.
+
+        Override of built in prepare. The arguments are merged while they
+        are still current, and the record is copied so handlers further up
+        the logger hierarchy still get the original.
+
+        Args:
+            record (LogRecord): The record to queue.
+
+        Returns:
+            record (LogRecord): The copied record.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+
+def get_log_handler() -> logging.Handler:
+    """Get the handler rendering the log records, as set in the config.
+
+    Returns:
+        handler (Handler): The rich handler, or a plain stream handler if
+            'log_handler' is set to 'plain'.
+    """
+    if CONFIG['log_handler'] == 'plain':
+        handler = logging.StreamHandler()
+    else:
+        handler = RichLogHandler()
+
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+
+    return handler
+
+
+def start_logging() -> None:
+    """Set up logging, rendering the records on a listener thread.
+
+    The records are rendered on the calling thread instead when 'log_queue'
+    is disabled in the config.
+    """
+    global LISTENER, QUEUE_HANDLER
+
+    handler = get_log_handler()
+
+    if CONFIG['log_queue']:
+        log_queue = queue.SimpleQueue()
+        LISTENER = logging.handlers.QueueListener(
+            log_queue, handler, respect_handler_level=True
+        )
+        LISTENER.start()
+        atexit.register(stop_logging)
+
+        QUEUE_HANDLER = LogQueueHandler(log_queue)
+        handler = QUEUE_HANDLER
+
+    logging.basicConfig(level=CONFIG['log_level'], handlers=[handler])
+
+
+def stop_logging() -> None:
+    """Render the queued records and stop the listener thread.
+
+    Records logged afterwards are rendered on the calling thread.
+    """
+    global LISTENER, QUEUE_HANDLER
+
+    if not LISTENER:
+        return
+
+    LISTENER.stop()
+
+    root_logger = logging.getLogger()
+    if QUEUE_HANDLER in root_logger.handlers:
+        root_logger.removeHandler(QUEUE_HANDLER)
+        for handler in LISTENER.handlers:
+            root_logger.addHandler(handler)
+
+    LISTENER = None
+    QUEUE_HANDLER = None
 
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(name)s %(asctime)s [%(filename)s:%(lineno)d]> %(message)s',
-    datefmt='%Y/%m/%d %I:%M:%S%p',
-    handlers=[RichHandler(rich_tracebacks=True)],
-)
+start_logging()
 LOG = logging.getLogger('TwitchBot')
@@ -1,6 +1,7 @@
 """Unified Window Class."""
 
-import webbrowser
+import shiboken6
+import weakref
 
 from PySide6 import QtCore, QtGui, QtWidgets
 from typing import Callable, Optional
@@ -8,6 +9,7 @@ from typing import Callable, Optional
 import utils
 
 from log import LOG
+from stylesheet import StyleRules
 
 
 class Nori(QtWidgets.QMainWindow):
@@ -16,8 +18,13 @@ class Nori(QtWidgets.QMainWindow):
     DEFAULT_ICON = 'defaultIcon.png'
     DEFAULT_TITLE = 'Nori'
 
+    # Shared with every module and updated in place when it is reloaded;
+    # see config_notifier.reload_config
     PACKAGE_CONFIG = utils.get_package_config()
 
+    # Every live Nori window; see get_instances
+    INSTANCES = weakref.WeakSet()
+
     def __init__(
         self,
         parent: Optional[QtWidgets.QWidget] = None,
@@ -34,6 +41,8 @@ class Nori(QtWidgets.QMainWindow):
         refresh: Optional[Callable] = None,
         help_link: Optional[str] = None,
         fonts: Optional[list[str]] = None,
+        app_style: Optional[bool] = None,
+        prune_style: Optional[bool] = None,
     ) -> None:
         """Initialize the window.
 
@@ -56,6 +65,8 @@ class Nori(QtWidgets.QMainWindow):
                 'none' can also be provided to not apply any styling.
                     In the case of a child window, it will inherit the parents
                     style and palette.
+                'fast' can also be provided to apply the palette without a
+                    stylesheet; see fast_style for the supported subset.
             palette (str): The name of the palette to use.
                 If none is provided, a default is used.
             on_open (function): Function to run when the window opens.
@@ -66,8 +77,24 @@ class Nori(QtWidgets.QMainWindow):
             help_link (str): The URL of the Confluence page for the
                 application.
             fonts (list): List of font families to load.
+            app_style (bool): Whether or not to apply the style to the whole
+                application instead of the window.
+                The first window applies its style to the application and
+                windows with the same style and palette reuse it; only
+                windows with a different style and palette get their own.
+                If nothing is provided, the config value is used.
+            prune_style (bool): Whether or not to only apply the stylesheet
+                rules matching the widgets in the window.
+                The stylesheet is pruned when the window is shown and again
+                when widgets of new classes are added directly to the
+                window, eg. dock panels and dialogs. Popups such as menus
+                are always styled; call refresh_stylesheet after adding new
+                types of widgets deeper in the window.
+                Pruned windows never use the application stylesheet.
+                If nothing is provided, the config value is used.
         """
         super(Nori, self).__init__(parent)
+        self.INSTANCES.add(self)
 
         self.parent = parent
         self.central_widget = central_widget
@@ -83,6 +110,16 @@ class Nori(QtWidgets.QMainWindow):
         self.refresh = refresh
         self.help_link = help_link or self.PACKAGE_CONFIG['nori_github_page']
         self.fonts = fonts or []
+        self.app_style = (
+            self.PACKAGE_CONFIG['apply_style_to_app']
+            if app_style is None
+            else app_style
+        )
+        self.prune_style = (
+            self.PACKAGE_CONFIG['prune_stylesheet']
+            if prune_style is None
+            else prune_style
+        )
 
         self.app = utils.get_app_instance()
 
@@ -111,7 +148,15 @@ class Nori(QtWidgets.QMainWindow):
 
         self.setWindowTitle(self.title)
         self.set_window_icon()
-        self.stylesheet = self._setStyleSheet()
+
+        # Pruned stylesheets are applied once the window's widgets exist,
+        # and again when widgets of new classes are added to the window
+        self.style_classes = frozenset()
+        self.prune_timer = QtCore.QTimer(self)
+        self.prune_timer.setSingleShot(True)
+        self.prune_timer.setInterval(0)
+        self.prune_timer.timeout.connect(self.on_children_added)
+        self.stylesheet = '' if self.prune_style else self._setStyleSheet()
 
         self._set_central_widget()
 
@@ -166,16 +211,194 @@ class Nori(QtWidgets.QMainWindow):
         if event.modifiers() and QtCore.Qt.ControlModifier:
             self.control = True
 
+    def showEvent(self, event: QtCore.QEvent) -> None:
+        """Apply the pruned stylesheet once the widgets exist.
+
+        Override of built in showEvent.
+
+        Args:
+            event (QEvent): Event triggering the show.
+        """
+        if self.prune_style:
+            self.refresh_stylesheet()
+
+        super(Nori, self).showEvent(event)
+
+    def childEvent(self, event: QtCore.QChildEvent) -> None:
+        """Check the pruned stylesheet once widgets are added to the window.
+
+        Override of built in childEvent.
+
+        Args:
+            event (QChildEvent): Event adding or removing the child.
+        """
+        # Children are only partly created when added, so they are checked
+        # once control returns to the event loop
+        if (
+            event.added()
+            and self.isVisible()
+            and self.prune_style
+            and event.child().isWidgetType()
+        ):
+            self.prune_timer.start()
+
+        super(Nori, self).childEvent(event)
+
+    def on_children_added(self) -> None:
+        """Prune the stylesheet again if widgets of new classes were added."""
+        new_classes = utils.get_widget_classes(self).difference(
+            self.style_classes, StyleRules.ALWAYS_KEEP
+        )
+        if new_classes:
+            LOG.debug('Restyling %s for: %s', self.title, sorted(new_classes))
+            self.refresh_stylesheet()
+
     def _setStyleSheet(self) -> None:
         """Set the window stylesheet."""
         # If the style given in 'none', don't apply any styling
         if self.style == 'none':
+            if self.styleSheet():
+                self.setStyleSheet('')
+            return ''
+
+        # The fast style uses the palette without a stylesheet
+        if self.style == utils.FAST_STYLE:
+            import fast_style
+
+            if self.styleSheet():
+                self.setStyleSheet('')
+            fast_style.apply_fast_style(
+                self.palette,
+                None if self.app and self.app_style else self,
+            )
             return ''
 
         style = utils.get_stylesheet(self.style, self.palette)
-        self.setStyleSheet(style)
+
+        if self.prune_style:
+            self.style_classes = utils.get_widget_classes(self)
+            local_style = utils.prune_stylesheet(style, self.style_classes)
+            if self.styleSheet() != local_style:
+                self.setStyleSheet(local_style)
+            return style
+
+        # Reuse the application stylesheet if it matches this window's
+        if self.app and self.app_style:
+            if not utils.get_app_theme():
+                utils.set_app_stylesheet(self.style, self.palette)
+
+            if utils.get_app_theme() == utils.get_theme_key(
+                self.style, self.palette
+            ):
+                if self.styleSheet():
+                    self.setStyleSheet('')
+                return style
+
+        if self.styleSheet() != style:
+            self.setStyleSheet(style)
         return style
 
+    def refresh_stylesheet(self) -> None:
+        """Re-apply the window stylesheet, eg. after its files changed."""
+        self.setUpdatesEnabled(False)
+        try:
+            self.stylesheet = self._setStyleSheet()
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def set_theme(
+        self, style: Optional[str] = None, palette: Optional[str] = None
+    ) -> bool:
+        """Change the style and palette of the window while it is open.
+
+        Args:
+            style (str): The name of the stylesheet to use.
+                If nothing is provided, the current style is kept.
+            palette (str): The name of the palette to use.
+                If nothing is provided, the current palette is kept.
+
+        Returns:
+            (bool): Whether or not the window was restyled.
+        """
+        style = style or self.style
+        palette = palette or self.palette
+        if (style, palette) == (self.style, self.palette):
+            return False
+
+        self.style = style
+        self.palette = palette
+        self.refresh_stylesheet()
+
+        LOG.debug('Set theme of %s: %s, %s', self.title, style, palette)
+        return True
+
+    @classmethod
+    def get_instances(cls) -> list:
+        """Get the live Nori windows.
+
+        Returns:
+            (list): The Nori windows that have not been deleted.
+        """
+        return [
+            window for window in cls.INSTANCES if shiboken6.isValid(window)
+        ]
+
+    @classmethod
+    def set_app_theme(
+        cls, style: Optional[str] = None, palette: Optional[str] = None
+    ) -> list:
+        """Change the style and palette of every open window.
+
+        All the palettes are rendered up front so switching between them
+        afterwards does not read any files. Windows using no styling and
+        windows already using the theme are left untouched.
+
+        Args:
+            style (str): The name of the stylesheet to use.
+                If nothing is provided, each window keeps its own style and
+                only the palette changes.
+            palette (str): The name of the palette to use.
+                If nothing is provided, a default is used.
+
+        Returns:
+            restyled (list): The windows that were restyled.
+        """
+        palette = palette or utils.DEFAULT_PALETTE
+        windows = [
+            window for window in cls.get_instances() if window.style != 'none'
+        ]
+
+        for window_style in {
+            style or window.style or utils.DEFAULT_STYLE for window in windows
+        }.difference([utils.FAST_STYLE]):
+            utils.prerender_themes(window_style)
+
+        # Windows following the application stylesheet are restyled at once
+        app_theme = utils.get_app_theme()
+        if app_theme:
+            if (style or app_theme[0]) == utils.FAST_STYLE:
+                app_theme = None
+            else:
+                utils.set_app_stylesheet(style or app_theme[0], palette)
+
+        restyled = []
+        for window in windows:
+            window_style = style or window.style or utils.DEFAULT_STYLE
+
+            follows_app = (
+                window.app_style and app_theme and not window.styleSheet()
+            )
+            if follows_app:
+                window.style = window_style
+                window.palette = palette
+                window.stylesheet = utils.get_stylesheet(window_style, palette)
+                restyled.append(window)
+
+            elif window.set_theme(window_style, palette):
+                restyled.append(window)
+
+        return restyled
+
     def _set_central_widget(self) -> None:
         """Set the central widget."""
         if isinstance(self.central_widget, str):
@@ -186,7 +409,7 @@ class Nori(QtWidgets.QMainWindow):
         if not self.central_widget:
             return
 
-        LOG.debug(f'Setting central_widget: {self.central_widget}')
+        LOG.debug('Setting central_widget: %s', self.central_widget)
         self.setCentralWidget(self.central_widget)
 
     def add_dock_panel(
@@ -234,6 +457,9 @@ class Nori(QtWidgets.QMainWindow):
 
         dock_widget.setFloating(floating)
 
+        if self.prune_style and self.isVisible():
+            self.refresh_stylesheet()
+
     def remove_dock_panel(self, title: str) -> bool:
         """Remove a dockable panel based on name.
 
@@ -251,7 +477,7 @@ class Nori(QtWidgets.QMainWindow):
                     widget.deleteLater()
 
                 self.docked_widgets[position]['widgets'].remove(widget)
-                LOG.debug(f'Removed panel: {title}')
+                LOG.debug('Removed panel: %s', title)
                 return True
 
         # This will run if nothing is found
@@ -373,6 +599,8 @@ class Nori(QtWidgets.QMainWindow):
 
     def get_help(self) -> None:
         """Open a browser window to the help page."""
+        import webbrowser
+
         webbrowser.open(self.help_link, new=0, autoraise=True)
 
     def remove_menu(self, name: str) -> None:
@@ -445,9 +673,14 @@ class Nori(QtWidgets.QMainWindow):
         Eg.
             font = QFont("Cousine", 24)
             self.setFont(font)
+
+        With 'lazy_fonts' in the config, the fonts are only registered and
+        each weight is loaded on first use, eg. through utils.get_font.
         """
-        for font in self.fonts:
-            utils.load_custom_fonts(font)
+        if self.PACKAGE_CONFIG['lazy_fonts']:
+            utils.register_font_families(families=self.fonts)
+        else:
+            utils.load_custom_fonts(families=self.fonts)
 
     def __repr__(self):
         """Return the instance."""
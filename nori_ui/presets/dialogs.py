@@ -73,11 +73,9 @@ class NDialog(nori.Nori):
         message_layout.addStretch(1)
 
         icon_label = QtWidgets.QLabel()
-        icon = utils.get_pixmap(self.message_icon)
+        icon = utils.get_scaled_pixmap(self.message_icon, 64, self)
         if icon:
-            icon_label.setPixmap(
-                icon.scaledToWidth(64, QtCore.Qt.SmoothTransformation)
-            )
+            icon_label.setPixmap(icon)
             message_layout.addWidget(icon_label)
 
         message_label = QtWidgets.QLabel(self.message)
@@ -0,0 +1,249 @@
+"""Log console template."""
+
+import functools
+import logging
+import time
+
+from collections import deque
+from PySide6 import QtCore, QtGui, QtWidgets
+from typing import Optional
+
+from init import CONFIG
+
+CONSOLE_FORMAT = (
+    '%(asctime)s %(levelname)s %(name)s [%(filename)s:%(lineno)d]> '
+    '%(message)s'
+)
+DATE_FORMAT = '%H:%M:%S'
+
+# Levels shown by the level filter, from most to least verbose
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the most recently logged lines in a bounded buffer.
+
+    Records are formatted as they are emitted, while their arguments are
+    still current, and appended to a deque, which is thread safe, so any
+    thread can log without waiting on the GUI thread. Once the buffer is
+    full, the oldest lines are dropped.
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        """Init.
+
+        Args:
+            capacity (int): The number of lines to keep.
+                If nothing is provided, the config value is used.
+        """
+        super(RingBufferHandler, self).__init__()
+
+        # Level and text of the formatted records
+        self.lines = deque(maxlen=capacity or CONFIG['log_console_lines'])
+        self.setFormatter(logging.Formatter(CONSOLE_FORMAT, DATE_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format and buffer a log record.
+
+        Override of built in emit.
+
+        Args:
+            record (LogRecord): The record to buffer.
+        """
+        try:
+            self.lines.append((record.levelno, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+    def pop_line(self) -> Optional[tuple[int, str]]:
+        """Remove and return the oldest buffered line.
+
+        Returns:
+            (tuple) or None: The level and text of the line, if any are
+                buffered.
+        """
+        try:
+            return self.lines.popleft()
+        except IndexError:
+            return None
+
+
+class LogConsole(QtWidgets.QWidget):
+    """Show the log output, eg. in a panel added with Nori.add_dock_panel.
+
+    Records are buffered by a RingBufferHandler and written to the console
+    in batches on a timer, so heavy logging from any thread never blocks
+    the GUI thread and the console never holds more than a fixed number of
+    lines.
+    """
+
+    # Milliseconds between writing the buffered records to the console
+    FLUSH_INTERVAL = 100
+    # Milliseconds to spend collecting buffered lines per flush
+    TIME_SLICE = 10
+
+    def __init__(
+        self,
+        parent: Optional[QtWidgets.QWidget] = None,
+        logger: Optional[logging.Logger] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        """Init.
+
+        Args:
+            parent (QWidget): The parent widget.
+            logger (Logger): The logger to show the records of.
+                If nothing is provided, the root logger is used.
+            capacity (int): The number of lines to keep.
+                If nothing is provided, the config value is used.
+        """
+        super(LogConsole, self).__init__(parent)
+
+        self.logger = logger or logging.getLogger()
+        self.capacity = capacity or CONFIG['log_console_lines']
+        self.level = logging.DEBUG
+        self.search = ''
+        # Level and text of the lines written to the console
+        self.lines = deque(maxlen=self.capacity)
+
+        self.create_console()
+
+        self.handler = RingBufferHandler(self.capacity)
+        self.logger.addHandler(self.handler)
+        # Stop buffering once the console is gone, without keeping it alive
+        self.destroyed.connect(
+            functools.partial(self.logger.removeHandler, self.handler)
+        )
+
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self.flush_timer.timeout.connect(self.flush_records)
+        self.flush_timer.start()
+
+    def create_console(self) -> None:
+        """Create the console."""
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        filter_layout = QtWidgets.QHBoxLayout()
+
+        self.level_combo_box = QtWidgets.QComboBox()
+        for level in LEVELS:
+            self.level_combo_box.addItem(level, logging.getLevelName(level))
+        self.level_combo_box.currentIndexChanged.connect(self.on_level_changed)
+        filter_layout.addWidget(self.level_combo_box)
+
+        self.search_line_edit = QtWidgets.QLineEdit()
+        self.search_line_edit.setPlaceholderText('Search')
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self.on_search_changed)
+        filter_layout.addWidget(self.search_line_edit, 1)
+
+        clear_button = QtWidgets.QPushButton('Clear')
+        clear_button.clicked.connect(self.clear)
+        filter_layout.addWidget(clear_button)
+
+        layout.addLayout(filter_layout)
+
+        self.text_edit = QtWidgets.QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.text_edit.setMaximumBlockCount(self.capacity)
+        self.text_edit.setFont(
+            QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
+        )
+        layout.addWidget(self.text_edit)
+
+        self.setLayout(layout)
+
+    def is_shown(self, level: int, text: str) -> bool:
+        """Return whether a line passes the level and search filters.
+
+        Args:
+            level (int): The level of the record.
+            text (str): The formatted record.
+
+        Returns:
+            (bool): Whether the line is shown.
+        """
+        return level >= self.level and self.search in text.lower()
+
+    def flush_records(self) -> None:
+        """Write the buffered lines to the console for a time slice.
+
+        Lines left over are written on the next tick, unless they are
+        dropped from the buffer by newer lines first.
+        """
+        end_time = time.perf_counter() + (self.TIME_SLICE / 1000)
+
+        shown_lines = []
+        while time.perf_counter() < end_time:
+            line = self.handler.pop_line()
+            if line is None:
+                break
+
+            self.lines.append(line)
+            if self.is_shown(*line):
+                shown_lines.append(line[1])
+
+        if not shown_lines:
+            return
+
+        # Trimming many lines from the console is slower than writing all
+        # the kept lines again
+        if len(shown_lines) > self.capacity // 10 and (
+            self.text_edit.blockCount() + len(shown_lines) > self.capacity
+        ):
+            self.write_lines()
+            return
+
+        # Only follow the output when already scrolled to the end
+        scroll_bar = self.text_edit.verticalScrollBar()
+        at_end = scroll_bar.value() == scroll_bar.maximum()
+
+        self.text_edit.appendPlainText('\n'.join(shown_lines))
+
+        if at_end:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def write_lines(self) -> None:
+        """Write the kept lines passing the filters to the console."""
+        self.text_edit.setPlainText(
+            '\n'.join(
+                text
+                for level, text in self.lines
+                if self.is_shown(level, text)
+            )
+        )
+        scroll_bar = self.text_edit.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    def refresh(self) -> None:
+        """Write the console again after the filters changed."""
+        self.flush_records()
+        self.write_lines()
+
+    def on_level_changed(self, index: int) -> None:
+        """Show the lines of the selected level and above.
+
+        Args:
+            index (int): The index of the selected level.
+        """
+        self.level = self.level_combo_box.itemData(index)
+        self.refresh()
+
+    def on_search_changed(self, text: str) -> None:
+        """Show the lines containing the search text, ignoring case.
+
+        Args:
+            text (str): The search text.
+        """
+        self.search = text.lower()
+        self.refresh()
+
+    def clear(self) -> None:
+        """Clear the console and the kept lines."""
+        self.handler.lines.clear()
+        self.lines.clear()
+        self.text_edit.clear()
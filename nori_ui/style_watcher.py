@@ -0,0 +1,218 @@
+"""Hot reloading of styles and palettes."""
+
+import os
+
+from collections import deque
+from PySide6 import QtCore
+from typing import Optional
+
+import nori
+import utils
+
+from log import LOG
+
+# The running watcher; see start_hot_reload
+WATCHER = None
+
+
+class StyleWatcher(QtCore.QObject):
+    """Watch the style and palette files and restyle windows using them.
+
+    Bursts of changes (eg. an editor saving several files) are debounced
+    into a single reload. Only the windows using a changed file are
+    restyled, a few at a time, so the GUI stays responsive.
+    """
+
+    reloaded = QtCore.Signal(list)
+
+    WINDOWS_PER_BATCH = 4
+
+    def __init__(
+        self,
+        parent: Optional[QtCore.QObject] = None,
+        debounce: Optional[int] = None,
+    ) -> None:
+        """Init.
+
+        Args:
+            parent (QObject): The parent object.
+            debounce (int): Milliseconds to wait for changes to settle.
+                If nothing is provided, the config value is used.
+        """
+        super(StyleWatcher, self).__init__(parent)
+
+        self.changed_files = set()
+        self.pending_windows = deque()
+
+        self.file_watcher = QtCore.QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.file_watcher.directoryChanged.connect(self.watch_files)
+
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(
+            debounce or utils.get_package_config()['hot_reload_debounce']
+        )
+        self.debounce_timer.timeout.connect(self.reload)
+
+        self.restyle_timer = QtCore.QTimer(self)
+        self.restyle_timer.setInterval(0)
+        self.restyle_timer.timeout.connect(self.restyle_next_windows)
+
+        self.file_watcher.addPaths(
+            [utils.get_styles_path(), utils.get_palettes_path()]
+        )
+        self.watch_files()
+
+    def get_watched_files(self) -> list[str]:
+        """Get the style and palette files to watch.
+
+        Returns:
+            files (list): Paths to the style and palette files.
+        """
+        files = []
+        for folder, extension in (
+            (utils.get_styles_path(), '.qss'),
+            (utils.get_palettes_path(), '.palette'),
+        ):
+            files.extend(
+                os.path.join(folder, item)
+                for item in os.listdir(folder)
+                if item.endswith(extension)
+            )
+
+        # Also watch any external files used by open windows
+        for window in nori.Nori.get_instances():
+            if window.style == 'none':
+                continue
+            files.extend(utils.get_theme_key(window.style, window.palette))
+
+        return files
+
+    def watch_files(self, *args) -> None:
+        """Watch any style or palette files that are not yet watched.
+
+        Editors often replace a file when saving it, which removes it from
+        the watcher, so this also runs whenever a watched folder changes.
+        """
+        watched = set(self.file_watcher.files())
+        new_files = [
+            path
+            for path in set(self.get_watched_files())
+            if path not in watched and os.path.exists(path)
+        ]
+        if new_files:
+            self.file_watcher.addPaths(new_files)
+
+    def on_file_changed(self, path: str) -> None:
+        """Queue a changed file and wait for changes to settle.
+
+        Args:
+            path (str): Path to the changed file.
+        """
+        self.changed_files.add(path)
+        self.debounce_timer.start()
+
+    def reload(self) -> None:
+        """Re-render the changed themes and restyle the windows using them."""
+        self.watch_files()
+
+        changed_files = self.changed_files
+        self.changed_files = set()
+        if not changed_files:
+            return
+
+        LOG.info('Reloading styles: %s', ', '.join(changed_files))
+
+        # Palettes are the files in the palettes folder, or the palettes of
+        # the application and open windows, whatever their extension
+        app_theme = utils.get_app_theme()
+        themes = [
+            utils.get_theme_key(window.style, window.palette)
+            for window in nori.Nori.get_instances()
+            if window.style != 'none'
+        ]
+        if app_theme:
+            themes.append(app_theme)
+        palette_files = {palette_file for style_file, palette_file in themes}
+
+        palettes_path = utils.get_palettes_path()
+        for path in changed_files:
+            if os.path.dirname(path) == palettes_path or path in palette_files:
+                utils.invalidate_stylesheet_cache(palette=path)
+            else:
+                utils.invalidate_stylesheet_cache(style=path)
+
+        # Windows following the application stylesheet are restyled at once
+        if app_theme and changed_files.intersection(app_theme):
+            utils.set_app_stylesheet(*app_theme)
+
+        for window in nori.Nori.get_instances():
+            if window.style == 'none' or window in self.pending_windows:
+                continue
+
+            theme = utils.get_theme_key(window.style, window.palette)
+            if changed_files.intersection(theme):
+                self.pending_windows.append(window)
+
+        if self.pending_windows:
+            self.restyle_timer.start()
+
+        self.reloaded.emit(sorted(changed_files))
+
+    def restyle_next_windows(self) -> None:
+        """Restyle the next batch of windows waiting to be restyled."""
+        for _ in range(self.WINDOWS_PER_BATCH):
+            if not self.pending_windows:
+                break
+
+            window = self.pending_windows.popleft()
+            if window in nori.Nori.get_instances():
+                window.refresh_stylesheet()
+
+        if not self.pending_windows:
+            self.restyle_timer.stop()
+
+    def stop(self) -> None:
+        """Stop watching the files."""
+        self.debounce_timer.stop()
+        self.restyle_timer.stop()
+        self.pending_windows.clear()
+
+        paths = self.file_watcher.files() + self.file_watcher.directories()
+        if paths:
+            self.file_watcher.removePaths(paths)
+
+
+def start_hot_reload(
+    debounce: Optional[int] = None,
+) -> Optional[StyleWatcher]:
+    """Start reloading styles and palettes when their files change.
+
+    Args:
+        debounce (int): Milliseconds to wait for changes to settle.
+            If nothing is provided, the config value is used.
+
+    Returns:
+        (StyleWatcher) or None: The running watcher, unless the styles are
+            read from the resource bundle and cannot change.
+    """
+    global WATCHER
+
+    if utils.is_resource_path(utils.get_styles_path()):
+        LOG.warning('Styles cannot be hot reloaded from the resource bundle.')
+        return None
+
+    if not WATCHER:
+        WATCHER = StyleWatcher(utils.get_app_instance(), debounce)
+
+    return WATCHER
+
+
+def stop_hot_reload() -> None:
+    """Stop reloading styles and palettes when their files change."""
+    global WATCHER
+
+    if WATCHER:
+        WATCHER.stop()
+        WATCHER = None
@@ -0,0 +1,184 @@
+"""Stylesheet templates."""
+
+import re
+
+# Matches an '@variable' in a stylesheet or palette
+VARIABLE_PATTERN = re.compile(r'(@[A-Za-z_][A-Za-z0-9_]*)')
+
+
+def parse_palette(lines: list[str]) -> dict[str, str]:
+    """Parse the lines of a palette into variables.
+
+    Args:
+        lines (list): The lines of a palette file.
+            Each line should look like: @variable=value
+
+    Returns:
+        variables (dict): The values keyed by variable name, including the
+            leading '@'.
+    """
+    variables = {}
+    for line in lines:
+        line = line.strip()
+        if not line or '=' not in line:
+            continue
+
+        variable, value = line.split('=', 1)
+        variables[variable.strip()] = value.strip()
+
+    return variables
+
+
+class StyleTemplate(object):
+    """A stylesheet compiled into literal text and variable segments.
+
+    The stylesheet is tokenized once, after which any palette can be
+    rendered in a single pass over the segments. Since every variable is
+    matched in full, variables that share a prefix (eg. '@text_color' and
+    '@text_color_active') never collide.
+    """
+
+    def __init__(self, source: str) -> None:
+        """Init.
+
+        Args:
+            source (str): The stylesheet data containing '@variables'.
+        """
+        super(StyleTemplate, self).__init__()
+
+        self.source = source
+
+        # Literal segments are at even indices, variables at odd indices
+        self.segments = VARIABLE_PATTERN.split(source)
+        self.variables = self.segments[1::2]
+
+    def render(self, variables: dict[str, str]) -> str:
+        """Render the template with the given variables.
+
+        Unresolved variables are left untouched.
+
+        Args:
+            variables (dict): The values keyed by variable name.
+
+        Returns:
+            (str): The rendered stylesheet.
+        """
+        segments = self.segments[:]
+        for index in range(1, len(segments), 2):
+            segments[index] = variables.get(segments[index], segments[index])
+
+        return ''.join(segments)
+
+    def get_unresolved(self, variables: dict[str, str]) -> list[str]:
+        """Get the variables used in the template but missing a value.
+
+        Args:
+            variables (dict): The values keyed by variable name.
+
+        Returns:
+            (list): The sorted, unresolved variable names.
+        """
+        return sorted(set(self.variables).difference(variables))
+
+    def get_unused(self, variables: dict[str, str]) -> list[str]:
+        """Get the variables with a value but not used in the template.
+
+        Args:
+            variables (dict): The values keyed by variable name.
+
+        Returns:
+            (list): The sorted, unused variable names.
+        """
+        return sorted(set(variables).difference(self.variables))
+
+    def __len__(self) -> int:
+        """Return the number of variable references in the template."""
+        return len(self.variables)
+
+
+class StyleRules(object):
+    """A stylesheet split into rules that can be pruned by widget class.
+
+    Qt matches type selectors against a widget's class and every class it
+    inherits from, so a rule is only kept if every type it names is in the
+    given set of class names.
+    """
+
+    COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+    RULE_PATTERN = re.compile(r'([^{}]+)\{([^{}]*)\}')
+    # Attributes, pseudo-states and sub-controls never name a type
+    QUALIFIER_PATTERN = re.compile(r'\[[^\]]*\]|::?[!A-Za-z_-]+')
+    TYPE_PATTERN = re.compile(r'(?:^|[\s>+~])\.?([A-Za-z_][A-Za-z0-9_]*)')
+
+    # Types styled outside of any window's widget tree, and popups that are
+    # usually only created once the window is open, eg. context menus and
+    # combo box lists
+    ALWAYS_KEEP = frozenset(
+        ['QToolTip', 'QMenu', 'QAbstractItemView', 'QListView', 'QScrollBar']
+    )
+
+    def __init__(self, stylesheet: str) -> None:
+        """Init.
+
+        Args:
+            stylesheet (str): The rendered stylesheet data.
+        """
+        super(StyleRules, self).__init__()
+
+        self.rules = []
+        source = self.COMMENT_PATTERN.sub('', stylesheet)
+        for match in self.RULE_PATTERN.finditer(source):
+            selectors = [
+                selector.strip()
+                for selector in match.group(1).split(',')
+                if selector.strip()
+            ]
+            self.rules.append(
+                (
+                    [
+                        (selector, self.get_selector_types(selector))
+                        for selector in selectors
+                    ],
+                    match.group(2),
+                )
+            )
+
+    def get_selector_types(self, selector: str) -> frozenset[str]:
+        """Get the widget types a selector requires to match.
+
+        Args:
+            selector (str): A single selector, eg. 'QToolBar QToolButton'.
+
+        Returns:
+            (frozenset): The type names in the selector.
+        """
+        selector = self.QUALIFIER_PATTERN.sub('', selector)
+        return frozenset(self.TYPE_PATTERN.findall(selector))
+
+    def prune(self, class_names: set[str]) -> str:
+        """Build a stylesheet with only the rules that can match.
+
+        Args:
+            class_names (set): The class names of the widgets to style,
+                including the classes they inherit from.
+
+        Returns:
+            (str): The pruned stylesheet.
+        """
+        class_names = self.ALWAYS_KEEP.union(class_names)
+
+        rules = []
+        for selectors, body in self.rules:
+            kept = [
+                selector
+                for selector, types in selectors
+                if types.issubset(class_names)
+            ]
+            if kept:
+                rules.append('{} {{{}}}'.format(',\n'.join(kept), body))
+
+        return '\n\n'.join(rules)
+
+    def __len__(self) -> int:
+        """Return the number of rules."""
+        return len(self.rules)
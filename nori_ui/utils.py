@@ -1,395 +1,1757 @@
 """Utilities for the base window UI."""
 
+import hashlib
+import json
 import os
+import re
+import time
 
-from PySide6 import QtGui, QtWidgets
+from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import QPoint
 from typing import Optional
 
-from init import BASE_PATH, CONFIG, PROJECT_PATH
+from cache import DiskCache, LRUCache
+from font_registry import get_font_registry
+from stylesheet import StyleRules, StyleTemplate, parse_palette
+from init import CONFIG, PROJECT_PATH
 from log import LOG
 
 DEFAULT_STYLE = 'default'
 DEFAULT_PALETTE = 'default'
 
+# The style name selecting the fast style; see fast_style
+FAST_STYLE = 'fast'
+
+COLOR_PATTERN = re.compile(r'rgba?\(([^)]*)\)')
+
+# Rendered stylesheets, shared by every window in the process
+STYLESHEET_CACHE = LRUCache(CONFIG['stylesheet_cache_size'])
+
+# Compiled stylesheet templates, shared by every palette
+TEMPLATE_CACHE = LRUCache(CONFIG['stylesheet_cache_size'])
+
+# Stylesheets split into rules and pruned stylesheets; see prune_stylesheet
+RULES_CACHE = LRUCache(CONFIG['stylesheet_cache_size'])
+PRUNED_STYLESHEET_CACHE = LRUCache(CONFIG['pruned_stylesheet_cache_size'])
+
+# Icons shared by every window, bounded by the memory of their pixmaps
+ICON_CACHE = LRUCache(
+    CONFIG['icon_cache_size'], CONFIG['icon_cache_budget'] * 1024 * 1024
+)
+
+# Paths to the icons by name; see get_icon_index
+ICON_INDEX = None
+
+# Whether the QPixmapCache limit has been set; see set_pixmap_cache_limit
+PIXMAP_CACHE_LIMIT_SET = False
+
+# Rendered stylesheets, shared by every process; see get_theme_cache
+THEME_CACHE = None
+
+# Rendered SVG icons, shared by every process; see get_svg_cache
+SVG_CACHE = None
+
+# Bump this when the rendering changes to invalidate persisted stylesheets
+THEME_CACHE_VERSION = 1
+
+# The (style file, palette file) applied to the application; see
+# set_app_stylesheet
+APP_THEME = None
+
+# Resource bundle paths start with this; see register_resource_bundle
+RESOURCE_PREFIX = ':/nori'
+
+# The signature of the registered resource bundle, if there is one
+RESOURCE_BUNDLE_SIGNATURE = None
+
 
 def get_application_window() -> QtWidgets.QWidget:
     """Get the top level window for the current application.
 
     Returns:
-        (QWidget): The main window of the application.
+        (QWidget): The main window of the application.
+    """
+    return QtWidgets.QApplication.activeWindow()
+
+
+def get_app_instance() -> QtWidgets.QApplication:
+    """Get the application instance if one exists.
+
+    Returns:
+        (QApplication): The application instance or None
+    """
+    return QtWidgets.QApplication.instance()
+
+
+def create_app_instance() -> QtWidgets.QApplication:
+    """Create an app instance.
+
+    When a new instance is created, the icons listed in the config start
+    preloading in the background and, with 'lazy_fonts', the package fonts
+    are registered to load on first use.
+
+    Returns:
+        (QApplication): The application instance.
+    """
+    instance = get_app_instance()
+    if not instance:
+        instance = QtWidgets.QApplication([])
+
+        if CONFIG['preload_icons']:
+            import icon_preloader
+
+            icon_preloader.preload_icons()
+
+        if CONFIG['lazy_fonts']:
+            register_font_families()
+
+    return instance
+
+
+def get_resource_bundle_path() -> str:
+    """Return the path to the compiled Qt resource bundle.
+
+    Returns:
+        (str): Path to the resource bundle file.
+    """
+    return os.path.join(PROJECT_PATH, CONFIG['resource_bundle'])
+
+
+def register_resource_bundle() -> bool:
+    """Register the compiled Qt resource bundle if it is enabled.
+
+    Once registered, the icons, styles, palettes and fonts are read from
+    memory through ':/nori/...' paths instead of from the disk.
+
+    Returns:
+        (bool): Whether or not the resource bundle is registered.
+    """
+    global RESOURCE_BUNDLE_SIGNATURE
+
+    if RESOURCE_BUNDLE_SIGNATURE:
+        return True
+
+    bundle_path = get_resource_bundle_path()
+    if not CONFIG['use_resource_bundle'] or not os.path.exists(bundle_path):
+        return False
+
+    if not QtCore.QResource.registerResource(bundle_path):
+        LOG.error(f'Unable to register resource bundle: {bundle_path}')
+        return False
+
+    RESOURCE_BUNDLE_SIGNATURE = get_file_signature(bundle_path)
+    LOG.debug('Registered resource bundle: %s', bundle_path)
+    return True
+
+
+def is_resource_path(path: str) -> bool:
+    """Return whether a path points inside a Qt resource.
+
+    Args:
+        path (str): The path to check.
+
+    Returns:
+        (bool): Whether or not the path is a resource path.
+    """
+    return path.startswith(':')
+
+
+def path_exists(path: str) -> bool:
+    """Return whether a file or folder exists, including Qt resources.
+
+    Args:
+        path (str): The path to check.
+
+    Returns:
+        (bool): Whether or not the path exists.
+    """
+    if is_resource_path(path):
+        return QtCore.QFileInfo(path).exists()
+
+    return os.path.exists(path)
+
+
+def list_folder(path: str) -> list[str]:
+    """List the contents of a folder, including Qt resource folders.
+
+    Args:
+        path (str): Path to the folder.
+
+    Returns:
+        (list): The sorted names of the files and folders in the folder.
+    """
+    if is_resource_path(path):
+        return sorted(
+            QtCore.QDir(path).entryList(
+                QtCore.QDir.AllEntries | QtCore.QDir.NoDotAndDotDot
+            )
+        )
+
+    return sorted(os.listdir(path))
+
+
+def is_folder(path: str) -> bool:
+    """Return whether a path is a folder, including Qt resource folders.
+
+    Args:
+        path (str): The path to check.
+
+    Returns:
+        (bool): Whether or not the path is a folder.
+    """
+    if is_resource_path(path):
+        return QtCore.QFileInfo(path).isDir()
+
+    return os.path.isdir(path)
+
+
+def read_file(path: str) -> str:
+    """Read a text file, including Qt resource files.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        (str): The file data.
+    """
+    if is_resource_path(path):
+        resource_file = QtCore.QFile(path)
+        if not resource_file.open(QtCore.QFile.ReadOnly):
+            raise OSError(f'Unable to read resource: {path}')
+        data = bytes(resource_file.readAll()).decode('utf-8')
+        resource_file.close()
+        return data
+
+    with open(path, 'r') as inFile:
+        return inFile.read()
+
+
+def read_binary_file(path: str) -> bytes:
+    """Read a binary file, including Qt resource files.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        (bytes): The file data.
+    """
+    if is_resource_path(path):
+        resource_file = QtCore.QFile(path)
+        if not resource_file.open(QtCore.QFile.ReadOnly):
+            raise OSError(f'Unable to read resource: {path}')
+        data = bytes(resource_file.readAll())
+        resource_file.close()
+        return data
+
+    with open(path, 'rb') as inFile:
+        return inFile.read()
+
+
+def get_resource_root(location: str) -> str:
+    """Return the root of a packaged folder.
+
+    Args:
+        location (str): The location of the folder in the package,
+            eg. 'icons'.
+
+    Returns:
+        (str): The folder in the resource bundle if it is registered,
+            otherwise the folder in the package.
+    """
+    if RESOURCE_BUNDLE_SIGNATURE:
+        return f'{RESOURCE_PREFIX}/{os.path.basename(location)}'
+
+    return os.path.join(PROJECT_PATH, location)
+
+
+def get_icons_path() -> str:
+    """Return the directory containing the icons.
+
+    Returns:
+        icons_path (str): Path to the icons folder.
+    """
+    return get_resource_root(CONFIG['icons_location'])
+
+
+def get_styles_path() -> str:
+    """Return the directory containing the styles.
+
+    Returns:
+        styles_path (str): Path to the styles folder.
+    """
+    return get_resource_root(CONFIG['styles_location'])
+
+
+def get_palettes_path() -> str:
+    """Return the directory containing the palettes.
+
+    Returns:
+        palettes_path (str): Path to the palettes folder.
+    """
+    return os.path.join(get_styles_path(), CONFIG['palettes_location'])
+
+
+def get_fonts_path() -> str:
+    """Return the directory containing the fonts.
+
+    Returns:
+        fonts_path (str): Path to the fonts folder.
+    """
+    return get_resource_root(CONFIG['fonts_location'])
+
+
+def find_style(style: str) -> str:
+    """Get the path to a stylesheet file.
+
+    Args:
+        style (str): The path to or name of a style file.
+
+    Returns:
+        style_file (str): Path to the stylesheet file.
+    """
+    # Check if the style argument is a path to a file
+    if style and path_exists(style):
+        return style if is_resource_path(style) else os.path.abspath(style)
+
+    # If not, look for the style locally
+    styles_path = get_styles_path()
+    style_file = os.path.join(styles_path, f'{style}.qss')
+    if not path_exists(style_file):
+        LOG.debug('No stylesheet exists at: %s; using default', style_file)
+        style_file = os.path.join(styles_path, f'{DEFAULT_STYLE}.qss')
+
+    return style_file
+
+
+def find_palette(palette: str) -> str:
+    """Get the path to a palette file.
+
+    Args:
+        palette (str): The path to or name of a palette file.
+
+    Returns:
+        palette_file (str): Path to the palette file.
+    """
+    # Check if the palette argument is a path to a file
+    if palette and path_exists(palette):
+        if is_resource_path(palette):
+            return palette
+        return os.path.abspath(palette)
+
+    # If not, look for the palette locally
+    palettes_path = get_palettes_path()
+    palette_file = os.path.join(palettes_path, f'{palette}.palette')
+    if not path_exists(palette_file):
+        LOG.debug('No palette exists at: %s; using default', palette_file)
+        palette_file = os.path.join(
+            palettes_path, f'{DEFAULT_PALETTE}.palette'
+        )
+
+    return palette_file
+
+
+def get_file_signature(path: str) -> tuple:
+    """Get a signature of a file that changes when the file is modified.
+
+    The signature is built from the file's stats rather than its content so
+    it can be checked without reading the file. Files in the resource bundle
+    use the stats of the bundle.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        (tuple): The path, modification time and size of the file.
+    """
+    if is_resource_path(path):
+        return (path,) + (RESOURCE_BUNDLE_SIGNATURE or (None, 0, 0))[1:]
+
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_style(style: str) -> str:
+    """Get the data from the stylesheet.
+
+    Args:
+        style (str): The path to or name of a style file.
+
+    Returns:
+        style (str): The stylesheet data.
+    """
+    return read_file(find_style(style))
+
+
+def get_palette(palette: str) -> list[str]:
+    """Get the data from the pallette.
+
+    Args:
+        palette (str): The path to or name of a palette file.
+
+    Returns:
+        palettes (list): The palette data.
+    """
+    palettes = read_file(find_palette(palette)).splitlines(keepends=True)
+
+    return palettes
+
+
+def get_style_template(style: str) -> StyleTemplate:
+    """Get the compiled template for a stylesheet.
+
+    Templates are cached by the signature of the style file so the file is
+    only read and tokenized once per modification.
+
+    Args:
+        style (str): The path to or name of a style file.
+
+    Returns:
+        template (StyleTemplate): The compiled stylesheet template.
+    """
+    signature = get_file_signature(find_style(style))
+    template = TEMPLATE_CACHE.get(signature)
+    if template is None:
+        template = StyleTemplate(get_style(signature[0]))
+        TEMPLATE_CACHE.put(signature, template)
+
+    return template
+
+
+def get_palette_variables(palette: str) -> dict[str, str]:
+    """Get the variables defined by a palette.
+
+    The '@icons_path' variable is always defined and points to the icons
+    folder.
+
+    Args:
+        palette (str): The path to or name of a palette file.
+
+    Returns:
+        variables (dict): The values keyed by variable name.
+    """
+    variables = parse_palette(get_palette(palette))
+    variables['@icons_path'] = get_icons_path()
+
+    return variables
+
+
+def check_stylesheet(
+    style: Optional[str] = '', palette: Optional[str] = ''
+) -> dict[str, list[str]]:
+    """Check a stylesheet against a palette for mismatched variables.
+
+    Args:
+        style (str): Name of the style
+        palette (str): Name of the palette
+
+    Returns:
+        (dict): The 'unresolved' variables used by the stylesheet but not
+            defined by the palette and the 'unused' variables defined by the
+            palette but not used by the stylesheet.
+    """
+    template = get_style_template(style)
+    variables = get_palette_variables(palette)
+
+    return {
+        'unresolved': template.get_unresolved(variables),
+        'unused': template.get_unused(variables),
+    }
+
+
+def get_stylesheet(
+    style: Optional[str] = '',
+    palette: Optional[str] = '',
+    use_cache: Optional[bool] = True,
+) -> str:
+    """Parse the stylesheet with the palette.
+
+    Rendered stylesheets are cached in memory, keyed by the resolved style
+    and palette files and their signatures, so modifying either file
+    automatically renders a new stylesheet. If a theme cache is enabled,
+    rendered stylesheets are also shared between processes through it.
+
+    Args:
+        style (str): Name of the style
+        palette (str): Name of the palette
+        use_cache (bool): Whether or not to use the stylesheet cache.
+
+    Return:
+        stylesheet (str): The stylesheet to apply to the UI
+    """
+    style_file = find_style(style)
+    palette_file = find_palette(palette)
+    load_palette_fonts(palette_file)
+
+    cache_key = (
+        get_file_signature(style_file),
+        get_file_signature(palette_file),
+        get_icons_path(),
+    )
+
+    theme_cache = get_theme_cache() if use_cache else None
+    theme_cache_key = None
+
+    if use_cache:
+        stylesheet = STYLESHEET_CACHE.get(cache_key)
+        if stylesheet is not None:
+            return stylesheet
+
+    if theme_cache:
+        theme_cache_key = hashlib.sha256(
+            repr((THEME_CACHE_VERSION, cache_key)).encode('utf-8')
+        ).hexdigest()
+        stylesheet = theme_cache.get(theme_cache_key)
+        if stylesheet is not None:
+            STYLESHEET_CACHE.put(cache_key, stylesheet)
+            return stylesheet
+
+    template = get_style_template(style_file)
+    variables = get_palette_variables(palette_file)
+
+    unresolved = template.get_unresolved(variables)
+    if unresolved:
+        LOG.debug(
+            'Unresolved variables in %s using %s: %s',
+            style_file,
+            palette_file,
+            ', '.join(unresolved),
+        )
+
+    stylesheet = template.render(variables)
+
+    if use_cache:
+        STYLESHEET_CACHE.put(cache_key, stylesheet)
+
+    if theme_cache:
+        theme_cache.put(theme_cache_key, stylesheet)
+
+    return stylesheet
+
+
+def get_widget_classes(widget: QtWidgets.QWidget) -> frozenset[str]:
+    """Get the class names used by a widget and all of its children.
+
+    This includes the classes each widget inherits from, since stylesheet
+    type selectors also match subclasses.
+
+    Args:
+        widget (QWidget): The top widget to look through.
+
+    Returns:
+        (frozenset): The class names.
+    """
+    meta_objects = {
+        child.metaObject()
+        for child in [widget] + widget.findChildren(QtWidgets.QWidget)
+    }
+
+    class_names = set()
+    for meta_object in meta_objects:
+        while meta_object:
+            class_names.add(meta_object.className())
+            meta_object = meta_object.superClass()
+
+    return frozenset(class_names)
+
+
+def prune_stylesheet(stylesheet: str, class_names: frozenset[str]) -> str:
+    """Remove the rules from a stylesheet that cannot match any widget.
+
+    Fewer rules make styling faster when there are many widgets. Pruned
+    stylesheets are cached for each set of class names.
+
+    Args:
+        stylesheet (str): The rendered stylesheet data.
+        class_names (frozenset): The class names of the widgets to style,
+            eg. from get_widget_classes.
+
+    Returns:
+        pruned_stylesheet (str): The stylesheet without unused rules.
+    """
+    cache_key = (stylesheet, class_names)
+    pruned_stylesheet = PRUNED_STYLESHEET_CACHE.get(cache_key)
+    if pruned_stylesheet is not None:
+        return pruned_stylesheet
+
+    rules = RULES_CACHE.get(stylesheet)
+    if rules is None:
+        rules = StyleRules(stylesheet)
+        RULES_CACHE.put(stylesheet, rules)
+
+    pruned_stylesheet = rules.prune(class_names)
+    PRUNED_STYLESHEET_CACHE.put(cache_key, pruned_stylesheet)
+
+    return pruned_stylesheet
+
+
+def get_available_palettes() -> list[str]:
+    """Get the names of the palettes found in the palettes folder.
+
+    Returns:
+        (list): The sorted palette names.
+    """
+    return sorted(
+        os.path.splitext(palette)[0]
+        for palette in list_folder(get_palettes_path())
+        if palette.endswith('.palette')
+    )
+
+
+def prerender_themes(
+    style: Optional[str] = '', palettes: Optional[list[str]] = None
+) -> dict[str, str]:
+    """Render a stylesheet with every palette ahead of time.
+
+    The rendered stylesheets are kept in the stylesheet cache so switching
+    between them later does not read or render anything.
+
+    Args:
+        style (str): Name of the style
+        palettes (list): Names of the palettes to render.
+            If nothing is provided, all the available palettes are rendered.
+
+    Returns:
+        (dict): The rendered stylesheets keyed by palette name.
+    """
+    palettes = palettes or get_available_palettes()
+    if len(palettes) > STYLESHEET_CACHE.max_size:
+        LOG.warning(
+            f'Pre-rendering {len(palettes)} palettes exceeds the stylesheet '
+            f'cache size of {STYLESHEET_CACHE.max_size}.'
+        )
+
+    return {palette: get_stylesheet(style, palette) for palette in palettes}
+
+
+def get_theme_key(
+    style: Optional[str] = '', palette: Optional[str] = ''
+) -> tuple[str, str]:
+    """Get the key identifying a theme.
+
+    Args:
+        style (str): Name of the style
+        palette (str): Name of the palette
+
+    Returns:
+        (tuple): The resolved style file and palette file.
+    """
+    return (find_style(style), find_palette(palette))
+
+
+def get_app_theme() -> Optional[tuple[str, str]]:
+    """Get the theme applied to the application.
+
+    Returns:
+        (tuple) or None: The style file and palette file applied to the
+            application if there is one.
+    """
+    return APP_THEME
+
+
+def set_app_stylesheet(
+    style: Optional[str] = '', palette: Optional[str] = ''
+) -> str:
+    """Apply a stylesheet to the whole application.
+
+    Applying the stylesheet once to the application means Qt only parses it
+    once, rather than once for every window.
+
+    Args:
+        style (str): Name of the style
+        palette (str): Name of the palette
+
+    Returns:
+        stylesheet (str): The stylesheet applied to the application.
+    """
+    global APP_THEME
+
+    app = get_app_instance()
+    if not app:
+        raise RuntimeError('No currently running QApplication.')
+
+    stylesheet = get_stylesheet(style, palette)
+    app.setStyleSheet(stylesheet)
+    APP_THEME = get_theme_key(style, palette)
+
+    return stylesheet
+
+
+def clear_app_stylesheet() -> None:
+    """Remove the stylesheet applied to the whole application."""
+    global APP_THEME
+
+    app = get_app_instance()
+    if app and APP_THEME:
+        app.setStyleSheet('')
+
+    APP_THEME = None
+
+
+def get_theme_cache() -> Optional[DiskCache]:
+    """Get the on-disk cache of rendered stylesheets.
+
+    The cache is only enabled when 'theme_cache_location' is set in the
+    config or through set_theme_cache_location.
+
+    Returns:
+        (DiskCache) or None: The theme cache if it is enabled.
+    """
+    if THEME_CACHE is None and CONFIG['theme_cache_location']:
+        set_theme_cache_location(CONFIG['theme_cache_location'])
+
+    return THEME_CACHE or None
+
+
+def set_theme_cache_location(location: Optional[str]) -> None:
+    """Set the folder of the on-disk cache of rendered stylesheets.
+
+    Args:
+        location (str): Path to the cache folder.
+            Environment variables and '~' are expanded.
+            If nothing is provided, the theme cache is disabled.
+    """
+    global THEME_CACHE
+
+    if not location:
+        THEME_CACHE = False
+        return
+
+    location = os.path.expandvars(location)
+    try:
+        THEME_CACHE = DiskCache(
+            location,
+            max_entries=CONFIG['theme_cache_max_entries'],
+            max_age=CONFIG['theme_cache_max_age'],
+        )
+    except OSError as error:
+        LOG.error(f'Unable to use theme cache at {location}: {error}')
+        THEME_CACHE = False
+
+
+def apply_cache_config() -> None:
+    """Apply the cache settings from the config, eg. after reloading it.
+
+    Shrunk caches evict their extra entries as new entries are added.
+    """
+    global THEME_CACHE, SVG_CACHE, PIXMAP_CACHE_LIMIT_SET
+
+    for cache in (STYLESHEET_CACHE, TEMPLATE_CACHE, RULES_CACHE):
+        cache.max_size = CONFIG['stylesheet_cache_size']
+    PRUNED_STYLESHEET_CACHE.max_size = CONFIG['pruned_stylesheet_cache_size']
+    ICON_CACHE.max_size = CONFIG['icon_cache_size']
+    ICON_CACHE.max_cost = CONFIG['icon_cache_budget'] * 1024 * 1024
+
+    # The on-disk caches are opened again on next use
+    THEME_CACHE = None
+    SVG_CACHE = None
+    PIXMAP_CACHE_LIMIT_SET = False
+
+
+def invalidate_stylesheet_cache(
+    style: Optional[str] = None, palette: Optional[str] = None
+) -> int:
+    """Remove rendered stylesheets from the cache.
+
+    If neither a style nor a palette is given, the whole cache is cleared.
+
+    Args:
+        style (str): The path to or name of a style file to invalidate.
+        palette (str): The path to or name of a palette file to invalidate.
+
+    Returns:
+        (int): The number of removed stylesheets.
+    """
+    if not style and not palette:
+        TEMPLATE_CACHE.invalidate()
+        return STYLESHEET_CACHE.invalidate()
+
+    style_file = find_style(style) if style else None
+    palette_file = find_palette(palette) if palette else None
+
+    def _matches(key: tuple) -> bool:
+        style_signature, palette_signature, _ = key
+        return (
+            style_signature[0] == style_file
+            or palette_signature[0] == palette_file
+        )
+
+    TEMPLATE_CACHE.invalidate(lambda key: key[0] == style_file)
+    return STYLESHEET_CACHE.invalidate(_matches)
+
+
+def get_package_config() -> dict:
+    """Return the package config.
+
+    Returns:
+        (dict): The package config.
+    """
+    return CONFIG
+
+
+def find_fonts(
+    font_folder: Optional[str] = None, families: Optional[list[str]] = None
+) -> list:
+    """Find fonts based on the given folder and given families.
+
+    If not folder is given, look for fonts locally.
+    If no families are given, look for all valid fonts.
+
+    Args:
+        font_folder (str): Path to a folder containing font files.
+        families (list): List of font names.
+
+    Returns:
+        fonts_to_load (list): A list of the font files to load.
+    """
+    import font_index
+
+    if not font_folder:
+        LOG.info('No font folder given, using package fonts.')
+        return load_local_fonts(families)
+
+    if not path_exists(font_folder):
+        LOG.error(f'Font folder does not exist: {font_folder}')
+        return None
+
+    if not is_folder(font_folder):
+        LOG.error(f'Font folder path is not a folder: {font_folder}')
+        return None
+
+    if not is_resource_path(font_folder):
+        font_folder = os.path.abspath(font_folder)
+
+    return font_index.get_font_index().find_fonts([font_folder], families)
+
+
+def load_local_fonts(families: Optional[list[str]] = None) -> list:
+    """Load local fonts.
+
+    If no families are given, look for all valid fonts.
+
+    Args:
+        families (list): List of font names.
+
+    Returns:
+        fonts_to_load (list): A list of the font files to load.
+    """
+    import font_index
+
+    font_folder = get_fonts_path()
+
+    font_folders = [
+        os.path.join(font_folder, item)
+        for item in list_folder(font_folder)
+        if is_folder(os.path.join(font_folder, item))
+    ]
+
+    # Package fonts are grouped in folders named after their family, so
+    # only the matching folders need to be indexed
+    family_names = {family.lower() for family in families or []}
+    font_folders = [
+        folder
+        for folder in font_folders
+        if os.path.basename(folder).lower() in family_names
+    ] or font_folders
+
+    return font_index.get_font_index().find_fonts(font_folders, families)
+
+
+def load_custom_fonts(
+    font_folder: Optional[str] = None, families: Optional[list[str]] = None
+) -> list[int]:
+    """Load all the custom fonts found in the given folder.
+
+    This adds the fonts to the QFontDatabase to be used later. Fonts are
+    only loaded once per process, so repeating a request does nothing.
+
+    It is recommended that you load each family seperately.
+
+    Args:
+        font_folder (str): Path to a folder containing font files.
+        families (list): List of font names.
+
+    Returns:
+        font_ids (list): A list of the added font ids.
+    """
+    registry = get_font_registry()
+    request = (font_folder, tuple(sorted(families or [])))
+    font_ids = registry.get_request(request)
+    if font_ids is not None:
+        return font_ids
+
+    fonts_to_load = [
+        font if is_resource_path(font) else os.path.abspath(font)
+        for font in find_fonts(font_folder, families) or []
+    ]
+    font_ids = load_font_files(fonts_to_load)
+
+    registry.add_request(request, font_ids)
+
+    return font_ids
+
+
+def load_custom_font(font_file: str) -> int:
+    """Load a custom font from a file.
+
+    This adds the font to the QFontDatabase to be used later, unless it
+    was already added.
+
+    Args:
+        font_file (str): Path to a font file.
+
+    Returns:
+        font_id (int) or None: The id of the font.
+    """
+    registry = get_font_registry()
+    if registry.is_loaded(font_file):
+        return registry.load_file(font_file)
+
+    if not path_exists(font_file):
+        LOG.error(f'Font file does not exist: {font_file}')
+        return None
+
+    if os.path.splitext(font_file)[1] not in CONFIG['font_types']:
+        LOG.error(f'Font file is not an approved file type: {font_file}')
+        LOG.error('Approved types are: {}'.format(CONFIG['font_types']))
+        return None
+
+    return registry.load_file(font_file)
+
+
+def load_font_files(font_files: list[str]) -> list[int]:
+    """Load font files, reading them concurrently.
+
+    The files are read on worker threads, which hides the latency of slow
+    storage, then added to the QFontDatabase in one batch on the calling
+    thread.
+
+    Args:
+        font_files (list): Paths to the font files.
+
+    Returns:
+        font_ids (list): The ids of the loaded fonts.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = get_font_registry()
+    pending = [
+        font_file
+        for font_file in dict.fromkeys(font_files)
+        if not registry.is_loaded(font_file)
+    ]
+
+    if pending:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=CONFIG['font_loader_threads'] or None
+        ) as executor:
+            font_data = list(executor.map(read_font_data, pending))
+        read_time = time.perf_counter()
+
+        for font_file, data in zip(pending, font_data):
+            registry.load_data(font_file, data)
+        end_time = time.perf_counter()
+
+        LOG.info(
+            'Loaded %d fonts in %.1fms (reading: %.1fms, registering: '
+            '%.1fms)',
+            len(pending),
+            (end_time - start_time) * 1000,
+            (read_time - start_time) * 1000,
+            (end_time - read_time) * 1000,
+        )
+
+    font_ids = []
+    for font_file in font_files:
+        font_id = registry.load_file(font_file)
+        if font_id is not None:
+            font_ids.append(font_id)
+
+    return font_ids
+
+
+def read_font_data(font_file: str) -> bytes:
+    """Read a font file, eg. on a worker thread.
+
+    Args:
+        font_file (str): Path to the font file.
+
+    Returns:
+        (bytes): The font data, which is empty if it could not be read.
+    """
+    try:
+        return read_binary_file(font_file)
+    except OSError as error:
+        LOG.error(f'Unable to read font {font_file}: {error}')
+        return b''
+
+
+def register_font_families(
+    font_folder: Optional[str] = None, families: Optional[list[str]] = None
+) -> list[str]:
+    """Register font families to load the first time they are used.
+
+    Only the font files are indexed, nothing is loaded until a family is
+    requested through load_font_family, get_font or a palette.
+
+    Args:
+        font_folder (str): Path to a folder containing font files.
+            If nothing is provided, the package fonts are registered.
+        families (list): List of font names.
+
+    Returns:
+        (list): The registered family names.
+    """
+    import font_index
+
+    registry = get_font_registry()
+    index = font_index.get_font_index()
+
+    registered = set()
+    for font in find_fonts(font_folder, families) or []:
+        metadata = index.get_metadata(font)
+        if not metadata:
+            continue
+
+        registry.register_font(
+            metadata['family'], font, metadata['weight'], metadata['italic']
+        )
+        registered.add(metadata['family'])
+
+    return sorted(registered)
+
+
+def load_font_family(
+    family: str, weight: Optional[int] = None, italic: Optional[bool] = False
+) -> list[int]:
+    """Load the registered fonts of a family for a weight.
+
+    Args:
+        family (str): Name of the family.
+        weight (int): The weight, eg. 400 for regular or 700 for bold.
+            If nothing is provided, the regular weight is used.
+        italic (bool): Whether to load the italic fonts.
+
+    Returns:
+        (list): The ids of the loaded fonts.
+    """
+    return get_font_registry().load_family(family, weight, italic)
+
+
+def load_palette_fonts(palette: str) -> list[int]:
+    """Load the registered font family used by a palette.
+
+    Args:
+        palette (str): The path to or name of a palette file.
+
+    Returns:
+        font_ids (list): The ids of the loaded fonts.
+    """
+    registry = get_font_registry()
+    if not registry.manifest:
+        return []
+
+    request = ('palette', get_file_signature(find_palette(palette)))
+    font_ids = registry.get_request(request)
+    if font_ids is None:
+        family = get_palette_variables(palette).get('@font_family', '')
+        font_ids = registry.load_family(family.strip('\'"'))
+        registry.add_request(request, font_ids)
+
+    return font_ids
+
+
+def get_font(
+    family: str,
+    size: Optional[int] = None,
+    weight: Optional[int] = None,
+    italic: Optional[bool] = False,
+) -> QtGui.QFont:
+    """Get a font, loading its registered family first if required.
+
+    Args:
+        family (str): Name of the family.
+        size (int): The point size of the font.
+            If nothing is provided, the default size is used.
+        weight (int): The weight, eg. 400 for regular or 700 for bold.
+            If nothing is provided, the regular weight is used.
+        italic (bool): Whether the font is italic.
+
+    Returns:
+        font (QFont): The font.
+    """
+    load_font_family(family, weight, italic)
+
+    font = QtGui.QFont(family)
+    if size:
+        font.setPointSize(size)
+    if weight:
+        font.setWeight(QtGui.QFont.Weight(weight))
+    font.setItalic(italic)
+
+    return font
+
+
+def get_font_families() -> list[str]:
+    """Get the families provided by the loaded custom fonts.
+
+    Returns:
+        (list): The sorted family names.
     """
-    return QtWidgets.QApplication.activeWindow()
+    return get_font_registry().get_families()
 
 
-def get_app_instance() -> QtWidgets.QApplication:
-    """Get the application instance if one exists.
+def move_to_center(window: QtWidgets.QWidget) -> None:
+    """Move the window to the center of the screen.
+
+    Args:
+        window (QMainWindow or any QWidget): Any object that inherits QWidget
+    """
+    screen_center = calculate_center()
+    window_center = QPoint(window.width() / 2, window.height() / 2)
+    LOG.debug('window_center: %s', window_center)
+    LOG.debug('window_x: %s', screen_center.x() - window_center.x())
+    LOG.debug('window_y: %s', screen_center.y() - window_center.y())
+
+    window.move(
+        screen_center.x() - window_center.x(),
+        screen_center.y() - window_center.y(),
+    )
+
+
+def calculate_center() -> QPoint:
+    """Calculate the center point of the active monitor.
 
     Returns:
-        (QApplication): The application instance or None
+        screen_center (QPoint): (center x position, center y position)
     """
-    return QtWidgets.QApplication.instance()
+    app = QtWidgets.QApplication.instance()
 
+    if not app:
+        raise RuntimeError('No currently running QApplication.')
+
+    screen = app.primaryScreen()
+    screen_resolution = screen.availableGeometry()
+    LOG.debug('screen_resolution: %s', screen_resolution)
+
+    screen_center = QPoint(
+        (screen_resolution.width() / 2) + screen_resolution.left(),
+        (screen_resolution.height() / 2) + screen_resolution.top(),
+    )
+
+    LOG.debug('screen_center: %s', screen_center)
+
+    return screen_center
 
-def create_app_instance() -> QtWidgets.QApplication:
-    """Create an app instance.
+
+def get_icon_manifest_path() -> str:
+    """Return the path to the icon manifest.
 
     Returns:
-        (QApplication): The application instance.
+        (str): Path to the icon manifest file.
     """
-    instance = get_app_instance()
-    if not instance:
-        return QtWidgets.QApplication([])
-    else:
-        return instance
+    return os.path.join(get_icons_path(), CONFIG['icon_manifest'])
 
 
-def get_icons_path() -> str:
-    """Return the directory containing the icons.
+def get_icon_index() -> dict[str, str]:
+    """Get the index of the icons, building it on first use.
+
+    The index is read from the icon manifest (see write_icon_manifest) if it
+    is newer than the icons folder, otherwise the folder is scanned once.
 
     Returns:
-        icons_path (str): Path to the icons folder.
+        (dict): Paths to the icons keyed by file name and by name without
+            the extension.
     """
-    return os.path.join(PROJECT_PATH, CONFIG['icons_location'])
+    global ICON_INDEX
 
+    if ICON_INDEX is not None:
+        return ICON_INDEX
 
-def get_styles_path() -> str:
-    """Return the directory containing the styles.
+    icons_path = get_icons_path()
+    manifest_path = get_icon_manifest_path()
+    icon_files = None
+
+    try:
+        if is_resource_path(icons_path):
+            icon_files = list_icon_files()
+        elif os.stat(manifest_path).st_mtime >= os.stat(icons_path).st_mtime:
+            with open(manifest_path, 'r') as inFile:
+                icon_files = json.load(inFile)['icons']
+    except (OSError, ValueError, KeyError):
+        icon_files = None
+
+    if icon_files is None:
+        icon_files = list_icon_files()
+
+    ICON_INDEX = {}
+    for icon_file in icon_files:
+        icon_path = os.path.join(icons_path, icon_file)
+        ICON_INDEX.setdefault(os.path.splitext(icon_file)[0], icon_path)
+        ICON_INDEX[icon_file] = icon_path
+
+    LOG.debug('Indexed %d icons in: %s', len(icon_files), icons_path)
+
+    return ICON_INDEX
+
+
+def list_icon_files() -> list[str]:
+    """List the icon files in the icons folder.
 
     Returns:
-        styles_path (str): Path to the styles folder.
+        (list): The sorted icon file names.
     """
-    return os.path.join(PROJECT_PATH, CONFIG['styles_location'])
+    icon_types = CONFIG['icon_types']
+    try:
+        return [
+            name
+            for name in list_folder(get_icons_path())
+            if os.path.splitext(name)[1].lower() in icon_types
+        ]
+    except OSError as error:
+        LOG.error(f'Unable to index icons: {error}')
+        return []
 
 
-def get_palettes_path() -> str:
-    """Return the directory containing the palettes.
+def refresh_icon_index() -> dict[str, str]:
+    """Rebuild the index of the icons, eg. after adding icons.
 
     Returns:
-        palettes_path (str): Path to the palettes folder.
+        (dict): The rebuilt index.
     """
-    return os.path.join(get_styles_path(), CONFIG['palettes_location'])
+    global ICON_INDEX
 
+    ICON_INDEX = None
+    clear_icon_cache()
 
-def get_style(style: str) -> str:
-    """Get the data from the stylesheet.
+    return get_icon_index()
 
-    Args:
-        style (str): The path to or name of a style file.
+
+def write_icon_manifest() -> str:
+    """Write the icon manifest so the icons folder does not need scanning.
 
     Returns:
-        style (str): The stylesheet data.
+        manifest_path (str): Path to the written manifest.
     """
-    # Check if the style argument is a path to a file
-    if os.path.exists(style):
-        style_file = style
+    manifest_path = get_icon_manifest_path()
+    with open(manifest_path, 'w') as outFile:
+        json.dump({'icons': list_icon_files()}, outFile, indent=4)
 
-    # If not, look for the style locally
-    else:
-        styles_path = get_styles_path()
-        style_file = os.path.join(styles_path, f'{style}.qss')
-        if not os.path.exists(style_file):
-            LOG.debug(f'No stylesheet exists at: {style_file}; using default')
-            style_file = os.path.join(styles_path, DEFAULT_STYLE)
+    return manifest_path
 
-    with open(style_file, 'r') as inFile:
-        style = inFile.read()
 
-    return style
+def get_icon_variant_name(icon_name: str, variant: str) -> str:
+    """Get the name of a variant of an icon.
 
+    Args:
+        icon_name (str): Name of the icon, with or without its extension.
+        variant (str): The variant of the icon, eg. 'black'.
+
+    Returns:
+        (str): The name of the variant, eg. 'check-black.png'.
+    """
+    name, extension = os.path.splitext(icon_name)
+    return f'{name}-{variant}{extension}'
 
-def get_palette(palette: str) -> list[str]:
-    """Get the data from the pallette.
+
+def find_icon(icon_name: str, variant: Optional[str] = None) -> str:
+    """Get the path for an icon if it exists based on the name.
 
     Args:
-        palette (str): The path to or name of a palette file.
+        icon_name (str): Name of the icon, with or without its extension.
+        variant (str): The variant of the icon to use if it exists,
+            eg. 'black' for 'check-black.png'.
 
     Returns:
-        palettes (list): The palette data.
+        icon_path (str) or None: Path to the icon.
     """
-    # Check if the palette argument is a path to a file
-    if os.path.exists(palette):
-        palette_file = palette
+    # Check if a path was given
+    if '/' in icon_name:
+        if not path_exists(icon_name):
+            LOG.error(f'Unable to find icon: {icon_name}')
+            return None
+        return icon_name
 
-    # If not, look for the palette locally
-    else:
-        palettes_path = get_palettes_path()
-        palette_file = os.path.join(palettes_path, f'{palette}.palette')
-        if not os.path.exists(palette_file):
-            LOG.debug(f'No palette exists at: {palette_file}; using default')
-            palette_file = os.path.join(palettes_path, DEFAULT_PALETTE)
+    # Look for the icon locally
+    icon_index = get_icon_index()
 
-    with open(palette_file, 'r') as inFile:
-        palettes = inFile.readlines()
+    if variant:
+        icon_path = icon_index.get(get_icon_variant_name(icon_name, variant))
+        if icon_path:
+            return icon_path
 
-    palettes.sort(key=len, reverse=True)
+    icon_path = icon_index.get(icon_name)
+    if not icon_path:
+        LOG.error(f'Unable to find icon: {icon_name}')
 
-    return palettes
+    return icon_path
 
 
-def get_stylesheet(
-    style: Optional[str] = '', palette: Optional[str] = ''
+def get_pixmap_cache_key(
+    icon_name: str, size: Optional[int] = None, variant: Optional[str] = None
 ) -> str:
-    """Parse the stylesheet with the palette.
+    """Get the QPixmapCache key of an icon.
 
     Args:
-        style (str): Name of the style
-        palette (str): Name of the palette
+        icon_name (str): Name of the icon.
+        size (int): The size the largest side of the icon is scaled to.
+        variant (str): The variant of the icon.
 
-    Return:
-        stylesheet (str): The stylesheet to apply to the UI
+    Returns:
+        (str): The cache key.
     """
-    style = get_style(style)
-    palettes = get_palette(palette)
+    return f'nori:{icon_name}:{size or 0}:{variant or ""}'
 
-    for palette in palettes:
-        attribute, color = palette.split('=')
-        style = style.replace(attribute, color.strip())
 
-    stylesheet = style.replace('@icons_path', get_icons_path())
+def get_pixmap(
+    icon_name: str, size: Optional[int] = None, variant: Optional[str] = None
+) -> QtGui.QPixmap:
+    """Get the icon if it exists from the name as a QPixmap.
 
-    return stylesheet
+    Pixmaps are kept in the QPixmapCache, so each icon is only decoded and
+    scaled once while it is in use. SVG icons are rendered at the size
+    instead of being scaled.
 
+    Args:
+        icon_name (str): Name of the icon.
+        size (int): The size to scale the largest side of the icon to.
+            If nothing is provided, the icon is not scaled.
+        variant (str): The variant of the icon to use if it exists,
+            eg. 'black' for 'check-black.png'.
 
-def get_package_config() -> dict:
-    """Return the package config.
+    Returns:
+        (QPixmap) or None: Icon based on the name.
+    """
+    set_pixmap_cache_limit()
+
+    cache_key = get_pixmap_cache_key(icon_name, size, variant)
+    pixmap = QtGui.QPixmapCache.find(cache_key)
+    if pixmap:
+        return pixmap
+
+    # Generate color variants without their own file by tinting the icon
+    variant_color = CONFIG['icon_variant_colors'].get(variant)
+    if variant_color and (
+        get_icon_variant_name(icon_name, variant) not in get_icon_index()
+    ):
+        return get_tinted_pixmap(icon_name, variant_color, size)
+
+    icon_path = find_icon(icon_name, variant)
+    if not icon_path:
+        return None
+
+    if is_svg(icon_path):
+        pixmap = get_svg_pixmap(icon_path, size)
+        QtGui.QPixmapCache.insert(cache_key, pixmap)
+        return pixmap
+
+    pixmap = get_atlas_pixmap(icon_path) or QtGui.QPixmap(icon_path)
+    if size and not pixmap.isNull():
+        pixmap = pixmap.scaled(
+            size,
+            size,
+            QtCore.Qt.KeepAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+
+    QtGui.QPixmapCache.insert(cache_key, pixmap)
+
+    return pixmap
+
+
+def is_svg(icon_path: str) -> bool:
+    """Return whether an icon is an SVG file.
+
+    Args:
+        icon_path (str): Path to the icon.
 
     Returns:
-        (dict): The package config.
+        (bool): Whether the icon is an SVG file.
     """
-    return CONFIG
+    return icon_path.lower().endswith('.svg')
 
 
-def find_fonts(
-    font_folder: Optional[str] = None, families: Optional[list[str]] = None
-) -> list:
-    """Find fonts based on the given folder and given families.
+def render_svg(icon_path: str, size: Optional[int] = None) -> QtGui.QImage:
+    """Render an SVG icon.
 
-    If not folder is given, look for fonts locally.
-    If no families are given, look for all valid fonts.
+    Images can be rendered outside of the GUI thread.
 
     Args:
-        font_folder (str): Path to a folder containing font files.
-        families (list): List of font names.
+        icon_path (str): Path to the SVG file.
+        size (int): The size to render the largest side of the icon at.
+            If nothing is provided, the size set in the file is used.
 
     Returns:
-        fonts_to_load (list): A list of the font files to load.
+        image (QImage): The rendered icon, which is null if the file is
+            not a valid SVG.
     """
-    fonts_to_load = []
-    if not font_folder:
-        LOG.info('No font folder given, using package fonts.')
-        return load_local_fonts(families)
+    from PySide6 import QtSvg
 
-    if not os.path.exists(font_folder):
-        LOG.error(f'Font folder does not exist: {font_folder}')
-        return None
+    renderer = QtSvg.QSvgRenderer(icon_path)
+    if not renderer.isValid():
+        LOG.error(f'Unable to render icon: {icon_path}')
+        return QtGui.QImage()
 
-    if not os.path.isdir(font_folder):
-        LOG.error(f'Font folder path is not a folder: {font_folder}')
-        return None
+    image_size = renderer.defaultSize()
+    if size:
+        image_size = image_size.scaled(size, size, QtCore.Qt.KeepAspectRatio)
 
-    for font in os.listdir(font_folder):
-        if os.path.splitext(font)[1] not in CONFIG['font_types']:
-            continue
+    image = QtGui.QImage(image_size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(QtCore.Qt.transparent)
 
-        if families:
-            for family in families:
-                if family.lower() in font.lower():
-                    fonts_to_load.append(font)
-        else:
-            fonts_to_load.append(font)
+    painter = QtGui.QPainter(image)
+    renderer.render(painter)
+    painter.end()
 
-    return fonts_to_load
+    return image
 
 
-def load_local_fonts(families: Optional[list[str]] = None) -> list:
-    """Load local fonts.
+def get_svg_pixmap(
+    icon_path: str, size: Optional[int] = None
+) -> QtGui.QPixmap:
+    """Get an SVG icon rendered at a size as a QPixmap.
 
-    If no families are given, look for all valid fonts.
+    Rendered icons are read from and written to the SVG cache, if it is
+    enabled, so they are only rendered once across launches.
 
     Args:
-        families (list): List of font names.
+        icon_path (str): Path to the SVG file.
+        size (int): The size to render the largest side of the icon at.
+            If nothing is provided, the size set in the file is used.
 
     Returns:
-        fonts_to_load (list): A list of the font files to load.
+        pixmap (QPixmap): The rendered icon.
     """
-    fonts_to_load = []
+    svg_cache = get_svg_cache()
+    disk_key = None
+    if svg_cache:
+        disk_key = hashlib.sha256(
+            repr((get_file_signature(icon_path), size)).encode('utf-8')
+        ).hexdigest()
 
-    font_folder = os.path.join(BASE_PATH, CONFIG['fonts_location'])
+        data = svg_cache.get(disk_key)
+        pixmap = QtGui.QPixmap()
+        if data and pixmap.loadFromData(data, 'PNG'):
+            return pixmap
+
+    image = render_svg(icon_path, size)
+    if disk_key and not image.isNull():
+        buffer = QtCore.QBuffer()
+        buffer.open(QtCore.QIODevice.WriteOnly)
+        image.save(buffer, 'PNG')
+        svg_cache.put(disk_key, bytes(buffer.data()))
+
+    return QtGui.QPixmap.fromImage(image)
 
-    font_folders = []
-    for item in os.listdir(font_folder):
-        folder_path = os.path.join(font_folder, item)
-        if not os.path.isdir(folder_path):
-            continue
 
-        if families:
-            if item.lower() not in families.lower():
-                continue
+def get_svg_cache() -> Optional[DiskCache]:
+    """Get the on-disk cache of rendered SVG icons.
 
-        font_folders.append(folder_path)
+    The cache is only enabled when 'svg_cache_location' is set in the
+    config.
 
-    for folder in font_folders:
-        for font in os.listdir(folder):
-            fonts_to_load.append(os.path.join(folder, font))
+    Returns:
+        (DiskCache) or None: The SVG cache if it is enabled.
+    """
+    global SVG_CACHE
 
-    return fonts_to_load
+    if SVG_CACHE is not None:
+        return SVG_CACHE or None
 
+    SVG_CACHE = False
+    location = os.path.expandvars(CONFIG['svg_cache_location'])
+    if not location:
+        return None
 
-def load_custom_fonts(
-    font_folder: Optional[str] = None, families: Optional[list[str]] = None
-) -> list[int]:
-    """Load all the custom fonts found in the given folder.
+    try:
+        SVG_CACHE = DiskCache(
+            location,
+            max_entries=CONFIG['svg_cache_max_entries'],
+            binary=True,
+        )
+    except OSError as error:
+        LOG.error(f'Unable to use SVG cache at {location}: {error}')
 
-    This adds the fonts to the QFontDatabase to be used later.
+    return SVG_CACHE or None
 
-    It is recommended that you load each family seperately.
+
+def parse_color(value: str) -> Optional[QtGui.QColor]:
+    """Parse a stylesheet color.
 
     Args:
-        font_folder (str): Path to a folder containing font files.
-        families (list): List of font names.
+        value (str): The color, eg. 'rgb(0, 0, 0)', 'rgba(0, 0, 0, 50)',
+            '#000000' or 'black'.
 
     Returns:
-        font_ids (list): A list of the added font ids.
+        color (QColor) or None: The color if it is valid.
     """
-    font_ids = []
-    fonts_to_load = find_fonts(font_folder, families)
+    match = COLOR_PATTERN.match(value.strip())
+    if match:
+        channels = [int(channel) for channel in match.group(1).split(',')]
+        color = QtGui.QColor(*channels)
+    else:
+        color = QtGui.QColor(value.strip())
 
-    for font in fonts_to_load:
-        font_id = load_custom_font(os.path.abspath(font))
-        if font_id:
-            font_ids.append(font_id)
+    if not color.isValid():
+        LOG.debug('Invalid color: %s', value)
+        return None
 
-    return font_ids
+    return color
 
 
-def load_custom_font(font_file: str) -> int:
-    """Load a custom font from a file.
+def tint_image(image: QtGui.QImage, color: QtGui.QColor) -> QtGui.QImage:
+    """Recolor a monochrome image, keeping its transparency.
 
-    This adds the font to the QFontDatabase to be used later.
+    The whole image is composited at once by Qt rather than pixel by pixel.
 
     Args:
-        font_file (str): Path to a font file.
+        image (QImage): The image to recolor.
+        color (QColor): The color to use.
 
     Returns:
-        font_id (int): The id of the font.
+        tinted_image (QImage): The recolored image.
     """
-    if not os.path.exists(font_file):
-        LOG.error(f'Font file does not exist: {font_file}')
+    tinted_image = image.convertToFormat(
+        QtGui.QImage.Format_ARGB32_Premultiplied
+    )
+
+    painter = QtGui.QPainter(tinted_image)
+    painter.setCompositionMode(QtGui.QPainter.CompositionMode_SourceIn)
+    painter.fillRect(tinted_image.rect(), color)
+    painter.end()
+
+    return tinted_image
+
+
+def get_tinted_pixmap(
+    icon_name: str,
+    color: str,
+    size: Optional[int] = None,
+    palette: Optional[str] = None,
+) -> QtGui.QPixmap:
+    """Get an icon recolored to a color or palette variable as a QPixmap.
+
+    Each combination of icon, color and size is only recolored once.
+
+    Args:
+        icon_name (str): Name of the icon.
+        color (str): The color, eg. 'rgb(0, 0, 0)' or '#000000', or a
+            palette variable, eg. '@text_color'.
+        size (int): The size to scale the largest side of the icon to.
+            If nothing is provided, the icon is not scaled.
+        palette (str): The path to or name of the palette to get palette
+            variables from.
+            If nothing is provided, a default is used.
+
+    Returns:
+        (QPixmap) or None: The recolored icon.
+    """
+    if color.startswith('@'):
+        color = get_palette_variables(palette or DEFAULT_PALETTE).get(
+            color, ''
+        )
+
+    qcolor = parse_color(color)
+    if not qcolor:
+        LOG.error(f'Unable to tint icon {icon_name} with color: {color}')
         return None
 
-    if os.path.splitext(font_file)[1] not in CONFIG['font_types']:
-        LOG.error(f'Font file is not an approved file type: {font_file}')
-        LOG.error('Approved types are: {}'.format(CONFIG['font_types']))
+    cache_key = get_pixmap_cache_key(icon_name, size, f'#{qcolor.rgba():08x}')
+    pixmap = QtGui.QPixmapCache.find(cache_key)
+    if pixmap:
+        return pixmap
+
+    pixmap = get_pixmap(icon_name, size)
+    if not pixmap:
         return None
 
-    font_db = QtGui.QFontDatabase()
-    font_id = font_db.addApplicationFont(font_file)
+    pixmap = QtGui.QPixmap.fromImage(tint_image(pixmap.toImage(), qcolor))
+    QtGui.QPixmapCache.insert(cache_key, pixmap)
 
-    return font_id
+    return pixmap
 
 
-def move_to_center(window: QtWidgets.QWidget) -> None:
-    """Move the window to the center of the screen.
+def get_tinted_icon(
+    icon_name: str,
+    color: str,
+    size: Optional[int] = None,
+    palette: Optional[str] = None,
+) -> QtGui.QIcon:
+    """Get an icon recolored to a color or palette variable as a QIcon.
 
     Args:
-        window (QMainWindow or any QWidget): Any object that inherits QWidget
+        icon_name (str): Name of the icon.
+        color (str): The color, eg. 'rgb(0, 0, 0)' or '#000000', or a
+            palette variable, eg. '@text_color'.
+        size (int): The size to scale the largest side of the icon to.
+            If nothing is provided, the icon is not scaled.
+        palette (str): The path to or name of the palette to get palette
+            variables from.
+            If nothing is provided, a default is used.
+
+    Returns:
+        (QIcon) or None: The recolored icon.
     """
-    screen_center = calculate_center()
-    window_center = QPoint(window.width() / 2, window.height() / 2)
-    LOG.debug('window_center: {}'.format(window_center))
-    LOG.debug('window_x: {}'.format(screen_center.x() - window_center.x()))
-    LOG.debug('window_y: {}'.format(screen_center.y() - window_center.y()))
+    cache_key = (icon_name, size, color, palette)
+    icon = ICON_CACHE.get(cache_key)
+    if icon is not None:
+        return icon
 
-    window.move(
-        screen_center.x() - window_center.x(),
-        screen_center.y() - window_center.y(),
+    pixmap = get_tinted_pixmap(icon_name, color, size, palette)
+    if not pixmap:
+        return None
+
+    icon = QtGui.QIcon(pixmap)
+    ICON_CACHE.put(
+        cache_key, icon, pixmap.width() * pixmap.height() * pixmap.depth() // 8
     )
 
+    return icon
 
-def calculate_center() -> QPoint:
-    """Calculate the center point of the active monitor.
 
-    Returns:
-        screen_center (QPoint): (center x position, center y position)
-    """
-    app = QtWidgets.QApplication.instance()
+def get_device_pixel_ratio(
+    widget: Optional[QtWidgets.QWidget] = None,
+) -> float:
+    """Get the device pixel ratio to render icons at.
 
-    if not app:
-        raise RuntimeError('No currently running QApplication.')
+    Args:
+        widget (QWidget): The widget the icon is shown in.
+            If nothing is provided, the primary screen is used.
 
-    screen = app.primaryScreen()
-    screen_resolution = screen.availableGeometry()
-    LOG.debug('screen_resolution: {}'.format(screen_resolution))
+    Returns:
+        (float): The device pixel ratio.
+    """
+    if widget:
+        return widget.devicePixelRatioF()
 
-    screen_center = QPoint(
-        (screen_resolution.width() / 2) + screen_resolution.left(),
-        (screen_resolution.height() / 2) + screen_resolution.top(),
-    )
+    app = get_app_instance()
+    if app and app.primaryScreen():
+        return app.primaryScreen().devicePixelRatio()
 
-    LOG.debug(f'screen_center: {screen_center}')
+    return 1.0
 
-    return screen_center
 
+def get_scaled_pixmap(
+    icon_name: str,
+    size: int,
+    widget: Optional[QtWidgets.QWidget] = None,
+    variant: Optional[str] = None,
+) -> QtGui.QPixmap:
+    """Get an icon scaled to a logical size for the display it is shown on.
 
-def find_icon(icon_name: str) -> str:
-    """Get the path for an icon if it exists based on the name.
+    On high DPI displays the icon is scaled to the size in device pixels, so
+    it stays sharp. Each size and device pixel ratio is only scaled once.
 
     Args:
         icon_name (str): Name of the icon.
+        size (int): The logical size to scale the largest side of the icon
+            to.
+        widget (QWidget): The widget the icon is shown in.
+            If nothing is provided, the primary screen is used.
+        variant (str): The variant of the icon to use if it exists,
+            eg. 'black' for 'check-black.png'.
 
     Returns:
-        icon_path (str) or None: Path to the icon.
+        (QPixmap) or None: Icon based on the name.
     """
-    # Check if a path was given
-    if '/' in icon_name:
-        icon_path = icon_name
+    device_pixel_ratio = get_device_pixel_ratio(widget)
 
-    # Look for the icon locally
-    else:
-        icon_path = os.path.join(get_icons_path(), icon_name)
+    cache_key = f'nori:{icon_name}:{size}@{device_pixel_ratio}:{variant or ""}'
+    pixmap = QtGui.QPixmapCache.find(cache_key)
+    if pixmap:
+        return pixmap
 
-    # Ensure the icon exists
-    if not os.path.exists(icon_path):
-        LOG.error(f'Unable to find icon: {icon_name}')
+    pixmap = get_pixmap(icon_name, round(size * device_pixel_ratio), variant)
+    if not pixmap:
         return None
 
-    return icon_path
+    # Tag a copy so the pixmap cached for the device size is left untouched
+    pixmap = pixmap.copy()
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    QtGui.QPixmapCache.insert(cache_key, pixmap)
 
+    return pixmap
 
-def get_pixmap(icon_name: str) -> QtGui.QPixmap:
-    """Get the icon if it exists from the name as a QPixmap.
+
+def get_atlas_pixmap(icon_path: str) -> Optional[QtGui.QPixmap]:
+    """Get an icon from the icon atlas, if it is available.
 
     Args:
-        icon_name (str): Name of the icon.
+        icon_path (str): Path to the icon in the icons folder.
 
     Returns:
-        (QPixmap) or None: Icon based on the name.
+        (QPixmap) or None: The icon if it is in the atlas.
     """
-    icon_path = find_icon(icon_name)
+    import icon_atlas
 
-    if icon_path:
-        return QtGui.QPixmap(icon_path)
-    else:
+    if is_resource_path(icon_path):
+        return None
+
+    if os.path.dirname(icon_path) != get_icons_path():
+        return None
+
+    atlas = icon_atlas.get_icon_atlas()
+    image = atlas.get_image(os.path.basename(icon_path)) if atlas else None
+    if not image:
         return None
 
+    return QtGui.QPixmap.fromImage(image)
 
-def get_icon(icon_name: str) -> QtGui.QIcon:
+
+def get_icon(
+    icon_name: str, size: Optional[int] = None, variant: Optional[str] = None
+) -> QtGui.QIcon:
     """Get the icon if it exists from the name as a QIcon.
 
+    Icons are cached and shared, so the returned icon should not be
+    modified.
+
     Args:
         icon_name (str): Name of the icon.
+        size (int): The size to scale the largest side of the icon to.
+            If nothing is provided, the icon is not scaled.
+        variant (str): The variant of the icon to use if it exists,
+            eg. 'black' for 'check-black.png'.
 
     Returns:
         (QIcon) or None: Icon based on the name.
     """
-    pixmap = get_pixmap(icon_name)
+    cache_key = (icon_name, size, variant)
+    icon = ICON_CACHE.get(cache_key)
+    if icon is not None:
+        return icon
 
-    if pixmap:
-        return QtGui.QIcon(pixmap)
-    else:
+    pixmap = get_pixmap(icon_name, size, variant)
+    if not pixmap:
         return None
 
+    icon = QtGui.QIcon(pixmap)
+    ICON_CACHE.put(
+        cache_key, icon, pixmap.width() * pixmap.height() * pixmap.depth() // 8
+    )
+
+    return icon
+
+
+def set_pixmap_cache_limit() -> None:
+    """Set the QPixmapCache limit from the config, if it is not yet set."""
+    global PIXMAP_CACHE_LIMIT_SET
+
+    if PIXMAP_CACHE_LIMIT_SET:
+        return
+
+    limit = CONFIG['icon_cache_budget'] * 1024
+    if QtGui.QPixmapCache.cacheLimit() < limit:
+        QtGui.QPixmapCache.setCacheLimit(limit)
+
+    PIXMAP_CACHE_LIMIT_SET = True
+
+
+def clear_icon_cache() -> None:
+    """Remove all the cached icons and pixmaps."""
+    ICON_CACHE.invalidate()
+    QtGui.QPixmapCache.clear()
+
 
 def load_widget_from_file(path: str) -> QtWidgets.QWidget:
     """Load a widget from a .ui file.
@@ -411,8 +1773,11 @@ def load_widget_from_file(path: str) -> QtWidgets.QWidget:
         LOG.error('Widget file cannot be loaded: {}'.format(path))
         return None
 
-    LOG.debug('Loading widget from file: {}'.format(path))
+    LOG.debug('Loading widget from file: %s', path)
     widget = QUiLoader().load(ui_file)
     ui_file.close()
 
     return widget
+
+
+register_resource_bundle()
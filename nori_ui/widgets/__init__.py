@@ -1 +1,23 @@
-"""Init."""
+"""Init.
+
+Modules are imported on first access, so importing the package is free.
+"""
+
+import importlib
+
+from types import ModuleType
+
+
+def __getattr__(name: str) -> ModuleType:
+    """Import a module of the package on first access."""
+    module_name = f'{__name__}.{name}'
+    try:
+        return importlib.import_module(module_name)
+    except ModuleNotFoundError as error:
+        # Only a missing module of the package means a missing attribute;
+        # anything the module fails to import itself is a real error
+        if error.name != module_name:
+            raise
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        ) from None
@@ -26,8 +26,9 @@ class Switch(QtWidgets.QSlider):
         self.type = type
         if self.type not in self.VALID_SWITCH_TYPES:
             LOG.debug(
-                f'Switch type \'{self.type}\' invalid; should be one of: '
-                '{}'.format('\", \"'.join(self.VALID_SWITCH_TYPES))
+                'Switch type \'%s\' invalid; should be one of: %s',
+                self.type,
+                '\", \"'.join(self.VALID_SWITCH_TYPES),
             )
             self.type = 'round'
 
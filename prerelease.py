@@ -2,8 +2,14 @@
 """Script to run before releasing a new version."""
 
 import argparse
+import io
 import os
+import struct
 import subprocess
+import sys
+import tempfile
+
+from xml.sax.saxutils import quoteattr
 
 from rich.progress import Progress
 
@@ -16,6 +22,33 @@ DOCS_DIR = os.path.join(ROOT_DIR, 'docs')
 STATS_DIR = os.path.join(ROOT_DIR, 'project_stats')
 GITHUB_PATH = f'https://github.com/amorphousWaste/{PROJECT_NAME}'
 
+# Milliseconds importing the nori module may take, including PySide6
+IMPORT_TIME_BUDGET = 300
+# Modules that must only be imported when they are used
+LAZY_IMPORTS = (
+    'yaml',
+    'webbrowser',
+    'rich',
+    'concurrent.futures',
+    'config_notifier',
+    'fast_style',
+    'font_index',
+    'icon_atlas',
+    'icon_preloader',
+    'style_watcher',
+    'presets.dialogs',
+    'presets.log_console',
+    'widgets.switch',
+)
+# Fonts with known 'OS/2' weights and fsSelection flags, and the weight and
+# slant the font index must read from them
+KNOWN_FONTS = {
+    'Cousine/Cousine-Regular.ttf': (400, False),
+    'Cousine/Cousine-BoldItalic.ttf': (700, True),
+    'Montserrat/Montserrat-BlackItalic.ttf': (900, True),
+    'Montserrat/Montserrat-Bold.ttf': (700, False),
+}
+
 
 def get_args() -> dict:
     """Get the args from argparse.
@@ -37,6 +70,33 @@ def get_args() -> dict:
         action='store_true',
     )
 
+    parser.add_argument(
+        '--skipicons',
+        help='Run the pre-release script without generating the icon index '
+        'and atlas.',
+        action='store_true',
+    )
+
+    parser.add_argument(
+        '--skipresources',
+        help='Run the pre-release script without compiling the resource '
+        'bundle.',
+        action='store_true',
+    )
+
+    parser.add_argument(
+        '--skipfontcheck',
+        help='Run the pre-release script without checking the font '
+        'metadata.',
+        action='store_true',
+    )
+
+    parser.add_argument(
+        '--skipimporttime',
+        help='Run the pre-release script without checking the import time.',
+        action='store_true',
+    )
+
     parser.add_argument(
         '--skipblack',
         help='Run the pre-release script without black linting.',
@@ -81,6 +141,179 @@ def generate_stats() -> None:
     bot_stats.generate_stats_report()
 
 
+def generate_icons() -> None:
+    """Generate the icon manifest and atlas used to load the icons."""
+    sys.path.insert(0, PROJECT_DIR)
+    import icon_atlas
+    import utils
+
+    print(f'Wrote icon atlas: {icon_atlas.build_icon_atlas()}')
+    print(f'Wrote icon manifest: {utils.write_icon_manifest()}')
+
+    # Make sure the atlas is used when loaded from the written files
+    utils.refresh_icon_index()
+    icon_atlas.reset_icon_atlas()
+    if not icon_atlas.get_icon_atlas():
+        sys.exit('The generated icon atlas is out of date or invalid.')
+
+
+def generate_resource_bundle() -> None:
+    """Compile the icons, styles, palettes and fonts into a resource bundle."""
+    sys.path.insert(0, PROJECT_DIR)
+    import utils
+
+    config = utils.get_package_config()
+    prefix = utils.RESOURCE_PREFIX.lstrip(':')
+
+    files = []
+    for location in (
+        config['icons_location'],
+        config['styles_location'],
+        config['fonts_location'],
+    ):
+        folder = os.path.join(ROOT_DIR, location)
+        for root, _, file_names in os.walk(folder):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(root, file_name)
+                alias = os.path.join(
+                    os.path.basename(location),
+                    os.path.relpath(file_path, folder),
+                ).replace(os.sep, '/')
+                files.append(
+                    f'<file alias={quoteattr(alias)}>{file_path}</file>'
+                )
+
+    bundle_path = utils.get_resource_bundle_path()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        collection_path = os.path.join(temp_dir, 'nori.qrc')
+        with open(collection_path, 'w') as outFile:
+            outFile.write('<RCC>\n')
+            outFile.write(f'    <qresource prefix="{prefix}">\n')
+            outFile.write('\n'.join(f'        {line}' for line in files))
+            outFile.write('\n    </qresource>\n</RCC>\n')
+
+        cmd = [
+            'pyside6-rcc',
+            '--binary',
+            '--compress-algo',
+            'none',
+            '-o',
+            bundle_path,
+            collection_path,
+        ]
+        subprocess.check_output(cmd, stderr=subprocess.STDOUT)
+
+    print(f'Wrote resource bundle: {bundle_path}')
+
+
+def get_import_times(module: str) -> dict[str, int]:
+    """Import a module in a new interpreter and measure the imports.
+
+    Args:
+        module (str): Name of the module to import.
+
+    Returns:
+        import_times (dict): The cumulative microseconds spent importing
+            each module keyed by name.
+    """
+    cmd = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+    result = subprocess.run(
+        cmd, cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        fields = line[len('import time:') :].split('|')
+        if not fields[1].strip().isdigit():
+            continue
+
+        import_times[fields[2].strip()] = int(fields[1])
+
+    return import_times
+
+
+def check_import_time(runs: int = 3) -> None:
+    """Check that importing nori stays within the import time budget.
+
+    The fastest of several runs is used to reduce noise, after a first run
+    warming up the config cache.
+
+    Args:
+        runs (int): The number of times to measure the import.
+    """
+    get_import_times('nori')
+    import_times = min(
+        (get_import_times('nori') for _ in range(runs)),
+        key=lambda import_times: import_times.get('nori', 0),
+    )
+
+    errors = [
+        f'{module} is imported eagerly.'
+        for module in LAZY_IMPORTS
+        if module in import_times
+    ]
+
+    import_time = import_times.get('nori', 0) / 1000
+    if import_time > IMPORT_TIME_BUDGET:
+        errors.append(
+            f'Importing nori took {import_time:.1f}ms, over the budget of '
+            f'{IMPORT_TIME_BUDGET}ms.'
+        )
+
+    if errors:
+        sys.exit('Import time check failed:\n' + '\n'.join(errors))
+
+    print(f'Importing nori took {import_time:.1f}ms.')
+
+
+def check_font_metadata() -> None:
+    """Check that the font index reads the weight and slant of fonts."""
+    sys.path.insert(0, PROJECT_DIR)
+    import font_index
+    import utils
+
+    fonts_path = os.path.join(
+        ROOT_DIR, utils.get_package_config()['fonts_location']
+    )
+
+    errors = []
+    for font_file, (weight, italic) in KNOWN_FONTS.items():
+        with open(os.path.join(fonts_path, font_file), 'rb') as inFile:
+            metadata = font_index.read_font_metadata(inFile)
+        if (metadata['weight'], metadata['italic']) != (weight, italic):
+            errors.append(
+                f'{font_file}: expected weight {weight} and italic {italic}, '
+                f'got {metadata["weight"]} and {metadata["italic"]}.'
+            )
+
+    # Set the flags of a font named 'Regular', so only fsSelection can mark
+    # it as italic, and give it an odd usFirstCharIndex right after it
+    with open(
+        os.path.join(fonts_path, 'Cousine/Cousine-Regular.ttf'), 'rb'
+    ) as inFile:
+        data = bytearray(inFile.read())
+    selection_offset = (
+        font_index.get_font_tables(io.BytesIO(data))['OS/2'][0]
+        + font_index.OS2_SELECTION_OFFSET
+    )
+    for selection, italic in ((0x0040, False), (0x0001, True)):
+        struct.pack_into('>HH', data, selection_offset, selection, 0x000D)
+        metadata = font_index.read_font_metadata(io.BytesIO(data))
+        if metadata['italic'] != italic:
+            errors.append(
+                f'fsSelection {selection:#06x}: expected italic {italic}, '
+                f'got {metadata["italic"]}.'
+            )
+
+    if errors:
+        sys.exit('Font metadata check failed:\n' + '\n'.join(errors))
+
+    print('Font metadata check passed.')
+
+
 def run_black() -> None:
     """Run black formatting check."""
     cmd = [
@@ -112,6 +345,18 @@ def run_prerelease() -> None:
     if not args.get('skipstats', False):
         generate_stats()
 
+    if not args.get('skipicons', False):
+        generate_icons()
+
+    if not args.get('skipresources', False):
+        generate_resource_bundle()
+
+    if not args.get('skipfontcheck', False):
+        check_font_metadata()
+
+    if not args.get('skipimporttime', False):
+        check_import_time()
+
     if not args.get('skipblack', False):
         run_black()
 